@@ -87,9 +87,18 @@ import re
 import sys
 import json
 import time
+import codecs
+import queue
 import random
 import hashlib
+import threading
+import uuid
+import struct
 import statistics
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -114,6 +123,16 @@ try:
 except Exception:
     vlc = None
 
+try:
+    import sqlite3
+except Exception:
+    sqlite3 = None
+
+try:
+    import fcntl
+except Exception:       # Windows: _FileLock falls back to an O_EXCL lock file
+    fcntl = None
+
 # ----- Theme / Consts -----
 BG = "#F4EEE3"
 FG = "#2E2924"
@@ -190,12 +209,28 @@ SORT_CHOICES = [
     "Size (Large→Small)", "Size (Small→Large)",
     "Duration (Long→Short)", "Duration (Short→Long)",
 ]
+# sort mode -> (item field, reverse)
+SORT_SPECS = {
+    "Title (A→Z)": ("name", False), "Title (Z→A)": ("name", True),
+    "Modified (Newest)": ("mtime", True), "Modified (Oldest)": ("mtime", False),
+    "Size (Large→Small)": ("size", True), "Size (Small→Large)": ("size", False),
+    "Duration (Long→Short)": ("duration_ms", True), "Duration (Short→Long)": ("duration_ms", False),
+}
+
+def _sort_value(field: str, v, reverse: bool):
+    if field == "name":
+        return v.lower()
+    if field == "duration_ms" and not v:
+        return -1 if reverse else 10**12     # unknown durations always sort last
+    return v
 
 DEFAULT_STATE = {
     "folder": "",
     "index": 0,
     "volume": 70,
     "song": "",
+    "song_id": None,     # inode+size identity (see _file_identity)
+    "song_hash": None,   # partial-content hash fallback
     "position": 0,  # ms
     "saved_at": 0
 }
@@ -492,113 +527,302 @@ def _match_name_score(candidate: str, audio_stem: str) -> float:
 
     return score
 
+_SUB_TAG_RE = re.compile(r"<[^>]+>")
+_SUB_WS_RE = re.compile(r"[ \t]+")
+
 def _cleanup_sub_text(txt: str) -> str:
-    txt = re.sub(r"<[^>]+>", "", txt)
-    txt = re.sub(r"[ \t]+", " ", txt)
+    if "<" in txt:
+        txt = _SUB_TAG_RE.sub("", txt)
+    if "  " in txt or "\t" in txt:
+        txt = _SUB_WS_RE.sub(" ", txt)
     return txt.strip()
 
 # ----- Subtitle parsing -----
+_TEXT_SNIFF_BYTES = 64 * 1024
+_TEXT_ENC_CACHE: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()   # path -> (size, mtime_ns, enc)
+_TEXT_ENC_CACHE_MAX = 1024
+
+def _sniff_text_encoding(data: bytes) -> str:
+    """Guess the encoding of subtitle bytes from the BOM, else from a bounded
+    prefix sample: NUL byte parity for BOM-less UTF-16, then UTF-8 validity,
+    then cp1258 (Vietnamese Windows)."""
+    if data.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if data.startswith(codecs.BOM_UTF16_LE) or data.startswith(codecs.BOM_UTF16_BE):
+        return "utf-16"
+    sample = data[:_TEXT_SNIFF_BYTES]
+    if b"\x00" in sample:
+        even, odd = sample[0::2].count(0), sample[1::2].count(0)
+        if odd > 2 * even:
+            return "utf-16-le"
+        if even > 2 * odd:
+            return "utf-16-be"
+    try:
+        # final=False: the sample may end inside a multi-byte sequence
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=len(sample) == len(data))
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1258"
+
 def _read_text_best_effort(path: Path) -> str:
-    """Read subtitle text with best-effort encoding detection.
+    """Read subtitle text, decoding it once.
 
-    Tries common encodings seen in subtitle files exported from YouTube, Windows tools,
-    and various editors (UTF-8/UTF-16/CP1258).
+    The encoding is sniffed (_sniff_text_encoding) and remembered per
+    (path, size, mtime), so reloading an unchanged file skips detection. If
+    the full decode fails after all, the remaining fallbacks are tried in order.
     """
-    data = path.read_bytes()
-    for enc in (
-        "utf-8-sig",
-        "utf-8",
-        "utf-16",
-        "utf-16-le",
-        "utf-16-be",
-        "cp1258",   # Vietnamese Windows
-        "cp1252",
-        "latin-1",
-    ):
-        try:
-            return data.decode(enc)
-        except Exception:
-            pass
-    return data.decode("utf-8", errors="replace")
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        data = f.read()
+    key, sig = str(path), (st.st_size, st.st_mtime_ns)
+    hit = _TEXT_ENC_CACHE.get(key)
+    enc = hit[2] if hit is not None and hit[:2] == sig else _sniff_text_encoding(data)
+    try:
+        text = data.decode(enc)
+    except UnicodeDecodeError:
+        for enc in ("utf-8", "cp1258", "cp1252", "latin-1"):
+            try:
+                text = data.decode(enc)
+                break
+            except UnicodeDecodeError:
+                pass
+    _TEXT_ENC_CACHE[key] = (*sig, enc)
+    _TEXT_ENC_CACHE.move_to_end(key)
+    if len(_TEXT_ENC_CACHE) > _TEXT_ENC_CACHE_MAX:
+        _TEXT_ENC_CACHE.popitem(last=False)
+    return text
+
+_SUB_TS = r"(?:([0-9]+):)?([0-9]+):([0-9]+)(?:[.,]([0-9]{1,3}))?"
+_SUB_TIMING_RE = re.compile(r"\s*" + _SUB_TS + r"\s*-->\s*" + _SUB_TS + r"(?: |$)")
+_SUB_FRAC_SCALE = (0, 100, 10, 1)      # ms per unit of a 1-3 digit fraction
+_SUB_SRT_HINT_RE = re.compile(r"\d{1,2}:\d{2}:\d{2}[,\.]\d{1,3}")
+
+def _sub_ts_ms(x: str) -> int:
+    """Slow path for timestamps _SUB_TIMING_RE does not cover (4+ fraction digits, …)."""
+    x = x.strip().replace(",", ".")
+    parts = x.split(":")
+    if len(parts) == 2:
+        h, m, s = 0, int(parts[0]), float(parts[1])
+    else:
+        h, m, s = int(parts[0]), int(parts[1]), float(parts[2])
+    return int(round((h * 3600 + m * 60 + s) * 1000))
+
+def _sub_timing(ln: str) -> Tuple[Optional[int], Optional[int]]:
+    """(start_ms, end_ms) of a `-->` line; (None, None) when it does not parse."""
+    m = _SUB_TIMING_RE.match(ln) if ln.count("-->") == 1 else None
+    if m is not None:
+        h1, m1, s1, f1, h2, m2, s2, f2 = m.groups()
+        a = int(m1) * 60_000 + int(s1) * 1000
+        b = int(m2) * 60_000 + int(s2) * 1000
+        if h1: a += int(h1) * 3_600_000
+        if h2: b += int(h2) * 3_600_000
+        if f1: a += int(f1) * _SUB_FRAC_SCALE[len(f1)]
+        if f2: b += int(f2) * _SUB_FRAC_SCALE[len(f2)]
+        return a, b
+    try:
+        left, right = ln.split("-->")
+        return _sub_ts_ms(left), _sub_ts_ms(right.strip().split(" ", 1)[0])
+    except Exception:
+        return None, None
 
+def iter_sub_cues(raw: str):
+    """Yield (start_ms, end_ms, text) for an SRT/VTT document in file order.
 
-def parse_vtt_or_srt(path: Path) -> List[Tuple[int, int, str]]:
-    """Return list of (start_ms, end_ms, text) for .vtt/.srt."""
-    raw = _read_text_best_effort(path)
+    One pass over the lines with precompiled patterns; a cue's text is joined
+    and cleaned only when the cue is emitted. parse_vtt_or_srt sorts the result.
+    """
     lines = raw.splitlines()
-
-    # Detect VTT via header
-    first_nonempty = ""
-    for ln in lines[:15]:
-        if ln.strip():
-            first_nonempty = ln.strip().lower()
-            break
+    first_nonempty = next((ln.strip().lower() for ln in lines[:15] if ln.strip()), "")
     is_vtt = first_nonempty.startswith("webvtt")
-
     # SRT typically has commas in timestamps, but some tools output dots.
-    ts_hint = 0
-    for ln in lines[:80]:
-        if "-->" in ln and re.search(r"\d{1,2}:\d{2}:\d{2}[,\.]\d{1,3}", ln):
-            ts_hint += 1
-    is_srt = (not is_vtt) and ts_hint > 0
-
-    cues: List[Tuple[int, int, str]] = []
-
-    def to_ms(x: str) -> int:
-        x = x.strip().replace(",", ".")
-        parts = x.split(":")
-        if len(parts) == 2:
-            h = 0
-            m = int(parts[0])
-            s = float(parts[1])
-        else:
-            h = int(parts[0])
-            m = int(parts[1])
-            s = float(parts[2])
-        return int(round((h * 3600 + m * 60 + s) * 1000))
+    is_srt = (not is_vtt) and any("-->" in ln and _SUB_SRT_HINT_RE.search(ln) for ln in lines[:80])
 
+    n = len(lines)
     buf: List[str] = []
     t_start = t_end = None
-
     for i, ln in enumerate(lines):
         if "-->" in ln:
-            # flush previous cue
             if t_start is not None and buf:
                 txt = "\n".join(buf).strip()
                 if txt:
-                    cues.append((t_start, t_end, _cleanup_sub_text(txt)))
+                    yield (t_start, t_end, _cleanup_sub_text(txt))
             buf = []
-            try:
-                left, right = ln.split("-->")
-                t_start = to_ms(left.strip())
-                right = right.strip().split(" ", 1)[0]
-                t_end = to_ms(right.strip())
-            except Exception:
-                t_start = t_end = None
-        else:
-            # skip SRT numeric index lines
-            if is_srt and ln.strip().isdigit() and (i + 1 < len(lines) and "-->" in lines[i + 1]):
-                continue
-
-            # blank line = cue separator
-            if ln.strip() == "" and buf:
-                if t_start is not None:
-                    txt = "\n".join(buf).strip()
-                    if txt:
-                        cues.append((t_start, t_end, _cleanup_sub_text(txt)))
+            t_start, t_end = _sub_timing(ln)
+            continue
+        if t_start is None:
+            continue                        # between cues (headers, NOTE/STYLE blocks, indices)
+        st = ln.strip()
+        if not st:
+            if buf:                         # blank line = cue separator
+                txt = "\n".join(buf).strip()
+                if txt:
+                    yield (t_start, t_end, _cleanup_sub_text(txt))
                 buf = []
                 t_start = t_end = None
             else:
-                if t_start is not None:
-                    buf.append(ln)
+                buf.append(ln)
+            continue
+        # skip SRT numeric index lines
+        if is_srt and st.isdigit() and i + 1 < n and "-->" in lines[i + 1]:
+            continue
+        buf.append(ln)
 
     if t_start is not None and buf:
         txt = "\n".join(buf).strip()
         if txt:
-            cues.append((t_start, t_end, _cleanup_sub_text(txt)))
+            yield (t_start, t_end, _cleanup_sub_text(txt))
+
+_I32 = "i" if array("i").itemsize == 4 else "l"
+_SUB_SPACE_RE = re.compile(r"\s+")
 
-    cues.sort(key=lambda x: x[0])
-    return cues
+class CueTrack:
+    """Subtitle cues of one file, stored column-wise and sorted by start.
+
+    starts/ends are array('i') of ms, texts a list of str. Derived columns are
+    built once on first use: nchars (text length without whitespace, for the
+    smart-hold per-char time) and end_max (running maximum of ends, so "is any
+    cue showing at t" is one bisect). eff_ends() holds the smart-hold display
+    ends for one set of parameters. Indexing and iteration still yield
+    (start_ms, end_ms, text) tuples.
+    """
+    __slots__ = ("starts", "ends", "texts", "_nchars", "_end_max", "_eff", "_eff_key", "_cursor")
+
+    def __init__(self, starts: Optional[array] = None, ends: Optional[array] = None,
+                 texts: Optional[List[str]] = None):
+        self.starts = starts if starts is not None else array(_I32)
+        self.ends = ends if ends is not None else array(_I32)
+        self.texts = texts if texts is not None else []
+        self._nchars: Optional[array] = None
+        self._end_max: Optional[array] = None
+        self._eff: Optional[array] = None
+        self._eff_key: Optional[Tuple[int, int, int]] = None
+        self._cursor = -1
+
+    @classmethod
+    def from_cues(cls, cues) -> "CueTrack":
+        """Build from (start_ms, end_ms, text) tuples in any order (stable sort by start)."""
+        tr = cls()
+        sa, ea, ta = tr.starts.append, tr.ends.append, tr.texts.append
+        for a, b, t in cues:
+            sa(a); ea(b); ta(t)
+        st = tr.starts
+        if any(a > b for a, b in zip(st, st[1:])):
+            order = sorted(range(len(st)), key=st.__getitem__)
+            tr.starts = array(_I32, (st[i] for i in order))
+            tr.ends = array(_I32, (tr.ends[i] for i in order))
+            tr.texts = [tr.texts[i] for i in order]
+        return tr
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> Tuple[int, int, str]:
+        return self.starts[i], self.ends[i], self.texts[i]
+
+    def __iter__(self):
+        return zip(self.starts, self.ends, self.texts)
+
+    def __eq__(self, other):
+        if not isinstance(other, CueTrack):
+            return NotImplemented
+        return self.starts == other.starts and self.ends == other.ends and self.texts == other.texts
+
+    @property
+    def nchars(self) -> array:
+        if self._nchars is None:
+            sub = _SUB_SPACE_RE.sub
+            self._nchars = array(_I32, (len(sub("", t)) for t in self.texts))
+        return self._nchars
+
+    @property
+    def end_max(self) -> array:
+        if self._end_max is None:
+            out, m = array(_I32), -(1 << 31)
+            for b in self.ends:
+                if b > m:
+                    m = b
+                out.append(m)
+            self._end_max = out
+        return self._end_max
+
+    def eff_ends(self, params: Tuple[int, int, int]) -> array:
+        """Smart-hold display end of every cue for params = (linger, min_hold,
+        per_char) ms: held for max(end, start + hold, end + linger), where hold =
+        max(min_hold, per_char * nchars), and cut 40 ms before the next cue starts.
+        Computed once per params."""
+        if self._eff is None or self._eff_key != params:
+            linger, min_hold, per_char = params
+            st, en, nc = self.starts, self.ends, self.nchars
+            n = len(st)
+            out = array("q", bytes(8 * n))
+            for i in range(n):
+                a, b = st[i], en[i]
+                end = max(b, a + max(min_hold, per_char * nc[i]), b + linger)
+                if i + 1 < n and end > st[i + 1] - 40:
+                    end = st[i + 1] - 40
+                out[i] = end
+            self._eff, self._eff_key = out, params
+        return self._eff
+
+    def index_at(self, t: int) -> int:
+        """Index of the last cue starting at or before t (-1 if none): O(1) while
+        playback moves forward (cursor hint), bisect otherwise."""
+        st, c = self.starts, self._cursor
+        n = len(st)
+        if 0 <= c < n and st[c] <= t:
+            if c + 1 == n or t < st[c + 1]:
+                return c
+            if c + 2 == n or t < st[c + 2]:
+                self._cursor = c + 1
+                return c + 1
+        self._cursor = k = bisect_right(st, t) - 1
+        return k
+
+def parse_vtt_or_srt(path: Path) -> CueTrack:
+    """Parse a .vtt/.srt file into a CueTrack (cues sorted by start)."""
+    return CueTrack.from_cues(iter_sub_cues(_read_text_best_effort(path)))
+
+# Parsed-cue blob (little-endian), stored by _CueCache:
+#   header  magic "PCUE", u16 version, u16 reserved, u32 n_cues, u32 text_len
+#   columns i32 start_ms x n, i32 end_ms x n, u32 text length (code points) x n
+#   text    UTF-8 of all cue texts concatenated
+SUB_PARSER_VERSION = 1      # bump when parse_vtt_or_srt output changes (invalidates cached cues)
+_CUE_BIN_MAGIC = b"PCUE"
+_CUE_BIN_VERSION = 1
+_CUE_BIN_HDR = struct.Struct("<4sHHII")
+
+def _encode_cues(track: CueTrack) -> bytes:
+    lens = array(_U32, map(len, track.texts))
+    text = "".join(track.texts).encode("utf-8")
+    out = bytearray(_CUE_BIN_HDR.pack(_CUE_BIN_MAGIC, _CUE_BIN_VERSION, 0, len(track), len(text)))
+    for a in (track.starts, track.ends, lens):
+        if sys.byteorder == "big":
+            a = array(a.typecode, a); a.byteswap()
+        out += a.tobytes()
+    return bytes(out + text)
+
+def _decode_cues(buf) -> CueTrack:
+    """Inverse of _encode_cues; raises ValueError on foreign or truncated data."""
+    if len(buf) < _CUE_BIN_HDR.size:
+        raise ValueError("cue blob: truncated header")
+    magic, ver, _, n, tlen = _CUE_BIN_HDR.unpack_from(buf, 0)
+    if magic != _CUE_BIN_MAGIC or ver != _CUE_BIN_VERSION or len(buf) != _CUE_BIN_HDR.size + 12 * n + tlen:
+        raise ValueError(f"cue blob: unsupported or truncated ({magic!r} v{ver})")
+    off, cols = _CUE_BIN_HDR.size, []
+    for code in (_I32, _I32, _U32):
+        a = array(code)
+        a.frombytes(buf[off:off + 4 * n])
+        if sys.byteorder == "big":
+            a.byteswap()
+        cols.append(a)
+        off += 4 * n
+    text = bytes(buf[off:off + tlen]).decode("utf-8")
+    starts, ends, lens = cols
+    texts, pos = [], 0
+    for k in lens:
+        texts.append(text[pos:pos + k])
+        pos += k
+    return CueTrack(starts, ends, texts)
 
 # ----- Pairing helpers -----
 def _suffix2_base(p: Path) -> Optional[str]:
@@ -677,16 +901,15 @@ def _closest_base_to_audio(bases: List[str], audio_stem: str, min_score: float =
     return best
 
 # ----- Alignment diagnostics -----
-def _has_text_at(cues: List[Tuple[int,int,str]], t: int) -> bool:
-    for a, b, _ in cues:
-        if t < a: return False
-        if a <= t < b: return True
-    return False
+def _has_text_at(cues: CueTrack, t: int) -> bool:
+    """Does any cue starting at or before t still run at t?"""
+    k = bisect_right(cues.starts, t)
+    return k > 0 and cues.end_max[k - 1] > t
 
-def _median_offset_en_to_vi(en_cues, vi_cues) -> Optional[float]:
+def _median_offset_en_to_vi(en_cues: CueTrack, vi_cues: CueTrack) -> Optional[float]:
     if not en_cues or not vi_cues: return None
-    en_st = [a for a,_,_ in en_cues]
-    vi_st = [a for a,_,_ in vi_cues]
+    en_st = en_cues.starts
+    vi_st = vi_cues.starts
     i = j = 0; diffs = []
     while i < len(en_st) and j < len(vi_st):
         e = en_st[i]; v = vi_st[j]
@@ -698,10 +921,10 @@ def _median_offset_en_to_vi(en_cues, vi_cues) -> Optional[float]:
     try: return statistics.median(diffs)
     except statistics.StatisticsError: return None
 
-def _alignment_diagnostics(en_cues, vi_cues) -> Tuple[str, float, Optional[float]]:
+def _alignment_diagnostics(en_cues: CueTrack, vi_cues: CueTrack) -> Tuple[str, float, Optional[float]]:
     if not en_cues or not vi_cues:
         return "Sub: (one track missing)", 0.0, None
-    end_ms = max(en_cues[-1][1], vi_cues[-1][1])
+    end_ms = max(en_cues.ends[-1], vi_cues.ends[-1])
     if end_ms <= 0:
         return "Sub: (invalid duration)", 0.0, None
     samples = 48; both = either = 0
@@ -724,6 +947,343 @@ def _alignment_diagnostics(en_cues, vi_cues) -> Tuple[str, float, Optional[float
         msg += " (check EN/VI files)"
     return msg, overlap, med_off
 
+# ----- Library walker -----
+_MEDIA_EXT_SET = frozenset(AUDIO_EXTS + VIDEO_EXTS)
+_SUB_EXT_SET = frozenset(SUB_EXTS)
+_IMAGE_EXT_SET = frozenset(IMAGE_EXTS)
+
+_RACY_DIR_SECS = 2.0   # dir mtimes this close to the last scan are re-listed (coarse FAT/SMB clocks)
+_STATIC_SHARD_DIR = ".prajna_static"      # sharded static cache (one file per directory + manifest)
+
+def _walk_library(root: Path, known_dirs: Optional[dict] = None, scanned_at: float = 0.0,
+                  cancel: Optional[threading.Event] = None, progress=None) -> dict:
+    """Walk `root` once with os.scandir and classify every file by extension.
+
+    `known_dirs` are fingerprints from a previous walk ({rel_dir: {"mtime", "n",
+    "subs"}}). A directory whose mtime still matches is not listed again: it costs
+    one stat, its cached subtitle names are reused and its known children are
+    visited. Only changed (or new) directories are scanned.
+
+    Returns a dict:
+      media   -> [(path_str, size, mtime, inode)] for AUDIO_EXTS + VIDEO_EXTS in scanned dirs
+      subs    -> [Path] for SUB_EXTS (scanned dirs + cached names of fresh dirs)
+      images  -> [Path] for IMAGE_EXTS in scanned dirs
+      dirs    -> {rel_dir: {"mtime", "n", "subs"}} fingerprints for every directory
+      fresh   -> set of rel_dirs whose fingerprint matched (not re-listed)
+      timings -> {"walk": seconds}
+      cancelled -> True if `cancel` was set before the walk finished
+    Symlinked directories are followed once (loops are skipped via dev/inode).
+    `progress(entries_seen)` is called at most every 0.1s (from the walking thread).
+    """
+    t0 = time.perf_counter()
+    last_progress = t0
+    seen_entries = 0
+    cancelled = False
+    media: List[Tuple[str, int, float, int]] = []
+    subs: List[Path] = []
+    images: List[Path] = []
+    dirs: Dict[str, dict] = {}
+    fresh = set()
+    known_dirs = known_dirs or {}
+    children: Dict[str, List[str]] = {}
+    for rel in known_dirs:
+        if rel != ".":
+            children.setdefault(rel.rpartition("/")[0] or ".", []).append(rel)
+    seen = set()
+    stack = [(str(root), ".")]
+    while stack:
+        if cancel is not None and cancel.is_set():
+            cancelled = True
+            break
+        if progress is not None and time.perf_counter() - last_progress >= 0.1:
+            progress(seen_entries)
+            last_progress = time.perf_counter()
+        d, rel = stack.pop()
+        try:
+            dst = os.stat(d)
+        except OSError:
+            continue
+        key = (dst.st_dev, dst.st_ino)
+        if dst.st_ino and key in seen:
+            continue
+        seen.add(key)
+        fp = known_dirs.get(rel)
+        if (isinstance(fp, dict) and fp.get("mtime") == dst.st_mtime
+                and dst.st_mtime < scanned_at - _RACY_DIR_SECS):
+            fresh.add(rel)
+            dirs[rel] = fp
+            subs.extend(Path(d) / name for name in fp.get("subs", []))
+            for child in children.get(rel, []):
+                stack.append((os.path.join(d, child.rpartition("/")[2]), child))
+            continue
+        n = 0
+        sub_names: List[str] = []
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    n += 1
+                    try:
+                        if e.is_dir():
+                            if e.name == _STATIC_SHARD_DIR:
+                                continue
+                            stack.append((e.path, e.name if rel == "." else f"{rel}/{e.name}"))
+                            continue
+                    except OSError:
+                        continue
+                    ext = os.path.splitext(e.name)[1].lower()
+                    if ext in _MEDIA_EXT_SET:
+                        try:
+                            st = e.stat()
+                            media.append((e.path, st.st_size, st.st_mtime, e.inode()))
+                        except OSError:
+                            media.append((e.path, 0, 0.0, 0))
+                    elif ext in _SUB_EXT_SET:
+                        subs.append(Path(e.path))
+                        sub_names.append(e.name)
+                    elif ext in _IMAGE_EXT_SET:
+                        images.append(Path(e.path))
+        except OSError:
+            continue
+        seen_entries += n
+        dirs[rel] = {"mtime": dst.st_mtime, "n": n, "subs": sub_names}
+    return {
+        "media": media, "subs": subs, "images": images, "dirs": dirs, "fresh": fresh,
+        "timings": {"walk": time.perf_counter() - t0}, "cancelled": cancelled,
+    }
+
+def _sub_index_from_paths(paths) -> Dict[str, Dict[str, Path]]:
+    """base -> {'en': Path, 'vi': Path} from an already-walked list of subtitle files."""
+    idx: Dict[str, Dict[str, Path]] = {}
+    for p in paths:
+        base = _suffix2_base(p)
+        if not base:
+            continue
+        lang = _suffix2_lang(p)
+        if lang not in ("en", "vi"):
+            continue
+        idx.setdefault(base, {})[lang] = p
+    return idx
+
+# ----- Track identity -----
+_ID_HASH_CHUNK = 64 * 1024
+
+def _file_identity(ino: int, size: int) -> Optional[str]:
+    """Rename-tolerant identity: inode + size (None where the FS has no inode numbers)."""
+    return f"{ino:x}:{size:x}" if ino else None
+
+def _content_hash(path: str, size: Optional[int] = None) -> Optional[str]:
+    """Partial-content fingerprint (size + first/last 64 KB) for moves across devices."""
+    try:
+        with open(path, "rb") as f:
+            if size is None:
+                size = os.fstat(f.fileno()).st_size
+            h = hashlib.sha1(str(size).encode("ascii"))
+            h.update(f.read(_ID_HASH_CHUNK))
+            if size > 2 * _ID_HASH_CHUNK:
+                f.seek(size - _ID_HASH_CHUNK)
+                h.update(f.read(_ID_HASH_CHUNK))
+        return h.hexdigest()[:20]
+    except OSError:
+        return None
+
+# ----- Duration probing -----
+_PROBE_HEAD_BYTES = 4 * 1024      # read up front; MP3/FLAC read more only when a tag or the sync search needs it
+_MP3_SYNC_SEARCH = 8192           # bytes after the ID3 tag searched for the first frame
+_MP3_FRAME_SLACK = 1536           # a frame (<= 1441 bytes) + the next header + Xing/VBRI fields
+
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),   # MPEG-1 Layer III
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),       # MPEG-2/2.5 Layer III
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+def _id3v2_size(head: bytes) -> int:
+    """Bytes taken by a leading ID3v2 tag (0 if none)."""
+    if len(head) >= 10 and head[:3] == b"ID3":
+        size = (head[6] & 0x7F) << 21 | (head[7] & 0x7F) << 14 | (head[8] & 0x7F) << 7 | (head[9] & 0x7F)
+        return 10 + size + (10 if head[5] & 0x10 else 0)
+    return 0
+
+def _mp3_frame_header(b: bytes, i: int) -> Optional[Tuple[int, int, int, int, int]]:
+    """Decode a Layer III frame header at b[i:i+4] -> (version_bits, bitrate_kbps, sr, frame_len, mono)."""
+    if i + 4 > len(b) or b[i] != 0xFF or (b[i + 1] & 0xE0) != 0xE0:
+        return None
+    ver = (b[i + 1] >> 3) & 0x03          # 3=MPEG1, 2=MPEG2, 0=MPEG2.5
+    layer = (b[i + 1] >> 1) & 0x03        # 1=Layer III
+    br_idx = (b[i + 2] >> 4) & 0x0F
+    sr_idx = (b[i + 2] >> 2) & 0x03
+    if ver == 1 or layer != 1 or br_idx in (0, 15) or sr_idx == 3:
+        return None
+    kbps = _MP3_BITRATES[1 if ver == 3 else 2][br_idx]
+    sr = _MP3_SAMPLE_RATES[ver][sr_idx]
+    pad = (b[i + 2] >> 1) & 0x01
+    frame_len = (144 if ver == 3 else 72) * kbps * 1000 // sr + pad
+    mono = ((b[i + 3] >> 6) & 0x03) == 3
+    return ver, kbps, sr, frame_len, mono
+
+def _fast_duration_mp3(f, head: bytes, size: int) -> Optional[int]:
+    start = _id3v2_size(head)
+    base = 0
+    if start + 4 > len(head):
+        # large embedded cover art: read the bytes right after the tag
+        f.seek(start)
+        head, base = f.read(_PROBE_HEAD_BYTES), start
+    i = start - base
+    stop = i + _MP3_SYNC_SEARCH
+    while True:
+        if i + _MP3_FRAME_SLACK > len(head) and base + len(head) < size:
+            f.seek(base + len(head))
+            head += f.read(_PROBE_HEAD_BYTES)
+        if i >= stop or i + 4 > len(head):
+            return None
+        hdr = _mp3_frame_header(head, i)
+        if hdr and _mp3_frame_header(head, i + hdr[3]) is not None:
+            break
+        i += 1
+    ver, kbps, sr, frame_len, mono = hdr
+    spf = 1152 if ver == 3 else 576
+    side = (17 if mono else 32) if ver == 3 else (9 if mono else 17)
+    x = i + 4 + side
+    tag = head[x:x + 4]
+    if tag in (b"Xing", b"Info") and len(head) >= x + 12:
+        flags = int.from_bytes(head[x + 4:x + 8], "big")
+        if flags & 0x1:
+            frames = int.from_bytes(head[x + 8:x + 12], "big")
+            return int(frames * spf * 1000 / sr) if frames else None
+    v = i + 4 + 32
+    if head[v:v + 4] == b"VBRI" and len(head) >= v + 18:
+        frames = int.from_bytes(head[v + 14:v + 18], "big")
+        return int(frames * spf * 1000 / sr) if frames else None
+    # CBR estimate from the audio payload size
+    audio_end = size
+    try:
+        f.seek(max(0, size - 128))
+        if f.read(3) == b"TAG":
+            audio_end -= 128
+    except OSError:
+        pass
+    audio_bytes = audio_end - (base + i)
+    return int(audio_bytes * 8 / kbps) if audio_bytes > 0 else None
+
+def _fast_duration_wav(f, head: bytes, size: int) -> Optional[int]:
+    if head[8:12] != b"WAVE":
+        return None
+    pos, byte_rate = 12, 0
+    for _ in range(64):
+        f.seek(pos)
+        ch = f.read(16)
+        if len(ch) < 8:
+            return None
+        cid, clen = ch[:4], int.from_bytes(ch[4:8], "little")
+        if cid == b"fmt " and len(ch) >= 16:
+            f.seek(pos + 8)
+            fmt = f.read(16)
+            byte_rate = int.from_bytes(fmt[8:12], "little") if len(fmt) >= 12 else 0
+        elif cid == b"data":
+            if not byte_rate:
+                return None
+            avail = size - (pos + 8)
+            data_len = clen if 0 < clen <= avail else avail
+            return int(data_len * 1000 / byte_rate)
+        pos += 8 + clen + (clen & 1)
+    return None
+
+def _fast_duration_flac(f, head: bytes) -> Optional[int]:
+    i = _id3v2_size(head)
+    if i + 8 + 34 > len(head):
+        f.seek(i)
+        head, i = f.read(8 + 34), 0
+    if head[i:i + 4] != b"fLaC" or len(head) < i + 8 + 34 or (head[i + 4] & 0x7F) != 0:
+        return None
+    si = head[i + 8:i + 8 + 34]
+    sr = (si[10] << 12) | (si[11] << 4) | (si[12] >> 4)
+    total = ((si[13] & 0x0F) << 32) | int.from_bytes(si[14:18], "big")
+    if not sr or not total:
+        return None
+    return int(total * 1000 / sr)
+
+def _fast_duration_mp4(f, size: int) -> Optional[int]:
+    def boxes(start, end, limit=64):
+        pos = start
+        for _ in range(limit):
+            if pos + 8 > end:
+                return
+            f.seek(pos)
+            h = f.read(16)
+            if len(h) < 8:
+                return
+            blen, btype, hlen = int.from_bytes(h[:4], "big"), h[4:8], 8
+            if blen == 1 and len(h) >= 16:
+                blen, hlen = int.from_bytes(h[8:16], "big"), 16
+            elif blen == 0:
+                blen = end - pos
+            if blen < hlen:
+                return
+            yield btype, pos + hlen, pos + blen
+            pos += blen
+
+    for btype, body, end in boxes(0, size):
+        if btype != b"moov":
+            continue
+        for ctype, cbody, _ in boxes(body, end):
+            if ctype != b"mvhd":
+                continue
+            f.seek(cbody)
+            mv = f.read(32)
+            if len(mv) < 20:
+                return None
+            if mv[0] == 1:
+                ts, dur = int.from_bytes(mv[20:24], "big"), int.from_bytes(mv[24:32], "big")
+            else:
+                ts, dur = int.from_bytes(mv[12:16], "big"), int.from_bytes(mv[16:20], "big")
+            return int(dur * 1000 / ts) if ts and dur and dur != 0xFFFFFFFF else None
+        return None
+    return None
+
+def _fast_probe_duration_ms(path: str) -> Optional[int]:
+    """Duration from container headers only (first few KB + a handful of seeks).
+
+    Handles WAV (fmt/data), FLAC (STREAMINFO), MP3 (Xing/Info/VBRI or a CBR
+    estimate) and MP4/M4A (mvhd). Returns None when the header is inconclusive
+    so the caller can fall back to mutagen.
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            head = f.read(_PROBE_HEAD_BYTES)
+            if head[:4] == b"RIFF":
+                return _fast_duration_wav(f, head, size)
+            if head[4:8] == b"ftyp":
+                return _fast_duration_mp4(f, size)
+            ext = os.path.splitext(path)[1].lower()
+            if head[:4] == b"fLaC" or ext == ".flac":
+                return _fast_duration_flac(f, head)
+            if ext == ".mp3":
+                return _fast_duration_mp3(f, head, size)
+    except (OSError, ValueError, IndexError, KeyError):
+        pass
+    return None
+
+def _mutagen_duration_ms(path: str) -> Optional[int]:
+    if MutagenFile is None:
+        return None
+    try:
+        mf = MutagenFile(path)
+        if mf is not None and mf.info and getattr(mf.info, "length", None):
+            return int(float(mf.info.length) * 1000)
+    except Exception:
+        pass
+    return None
+
+def _probe_duration_ms(path: str) -> Optional[int]:
+    """Duration of an audio file: header fast path, then mutagen (None for video / unknown)."""
+    if os.path.splitext(path)[1].lower() not in AUDIO_EXTS:
+        return None
+    dur = _fast_probe_duration_ms(path)
+    if dur is None:
+        dur = _mutagen_duration_ms(path)
+    return dur
+
 # ----- Simple expander -----
 class Expander(ttk.Frame):
     def __init__(self, master, title: str, open_=True):
@@ -784,31 +1344,1107 @@ def _atomic_write_json(path: Path, payload: dict) -> None:
             try: tmp.unlink()
             except Exception: pass
 
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(str(tmp), str(path))
+    finally:
+        if tmp.exists():
+            try: tmp.unlink()
+            except Exception: pass
+
+# ----- Compact binary static cache (static.bin) -----
+# Layout (little-endian, v2; every section starts on an 8-byte boundary):
+#   header  magic "PPST", u16 version, u16 flags, u32 n_tracks, u32 n_strings,
+#           u32 meta_len, u32 strtab_len, u32 reserved
+#   meta    UTF-8 JSON of everything except "tracks" (title, folder_id, dirs, order, ...)
+#   soffs   u32 x n_strings: byte offset of each string in strtab
+#   strtab  UTF-8 strings joined by NUL; index 0 is always ""
+#   columns n_tracks each: u32 dir, u32 name, u32 title, u32 folder, u32 id  (string indices)
+#                          u64 size, f64 mtime, i64 duration_ms (-1 = unknown)
+# path = strtab[dir] + strtab[name], so folder prefixes are stored once.
+# v1 (no soffs, 20-byte header, unaligned) is still readable.
+_STATIC_BIN_MAGIC = b"PPST"
+_STATIC_BIN_VERSION = 2
+_STATIC_BIN_HDR_V1 = struct.Struct("<4sHHIII")
+_STATIC_BIN_HDR = struct.Struct("<4sHHIIIII")
+_U32 = "I" if array("I").itemsize == 4 else "L"
+_STATIC_BIN_COLS = (_U32, _U32, _U32, _U32, _U32, "Q", "d", "q")
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+def _encode_static_bin(payload: dict) -> bytes:
+    strings: List[str] = [""]
+    intern: Dict[str, int] = {"": 0}
+    def sid(v) -> int:
+        v = "" if v is None else str(v)
+        i = intern.get(v)
+        if i is None:
+            i = intern[v] = len(strings)
+            strings.append(v)
+        return i
+    tracks = payload.get("tracks") or []
+    cols = [array(c) for c in _STATIC_BIN_COLS]
+    c_dir, c_name, c_title, c_folder, c_id, c_size, c_mtime, c_dur = cols
+    for t in tracks:
+        path = str(t["path"])
+        name = os.path.basename(path)
+        c_dir.append(sid(path[:len(path) - len(name)]))
+        c_name.append(sid(name))
+        c_title.append(sid(t.get("title")))
+        c_folder.append(sid(t.get("folder")))
+        c_id.append(sid(t.get("id")))
+        c_size.append(max(0, int(t.get("size") or 0)))
+        c_mtime.append(float(t.get("mtime") or 0.0))
+        d = t.get("duration_ms")
+        c_dur.append(int(d) if d is not None else -1)
+    meta = json.dumps({k: v for k, v in payload.items() if k != "tracks"},
+                      ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    encoded = [x.encode("utf-8") for x in strings]
+    soffs, pos = array(_U32), 0
+    for b in encoded:
+        soffs.append(pos)
+        pos += len(b) + 1
+    strtab = b"\0".join(encoded)
+    out = bytearray(_STATIC_BIN_HDR.pack(_STATIC_BIN_MAGIC, _STATIC_BIN_VERSION, 0, len(tracks),
+                                         len(strings), len(meta), len(strtab), 0))
+    for a in [meta, soffs, strtab] + cols:
+        out += b"\0" * (_pad8(len(out)) - len(out))
+        if isinstance(a, array):
+            if sys.byteorder == "big":
+                a.byteswap()
+            a = a.tobytes()
+        out += a
+    return bytes(out)
+
+def _static_bin_layout(buf) -> dict:
+    """Parse the header and locate each section; raises ValueError on
+    foreign, newer or truncated data."""
+    if len(buf) < _STATIC_BIN_HDR_V1.size:
+        raise ValueError("static.bin: truncated header")
+    magic, ver = struct.unpack_from("<4sH", buf, 0)
+    if magic != _STATIC_BIN_MAGIC or not 1 <= ver <= _STATIC_BIN_VERSION:
+        raise ValueError(f"static.bin: unsupported format {magic!r} v{ver}")
+    if ver == 1:
+        _, _, _, n, mlen, slen = _STATIC_BIN_HDR_V1.unpack_from(buf, 0)
+        nstr, align = 0, (lambda x: x)
+        off = _STATIC_BIN_HDR_V1.size
+    else:
+        _, _, _, n, nstr, mlen, slen, _ = _STATIC_BIN_HDR.unpack_from(buf, 0)
+        align = _pad8
+        off = _pad8(_STATIC_BIN_HDR.size)
+    lay = {"version": ver, "n": n, "n_strings": nstr, "meta": (off, mlen)}
+    off = align(off + mlen)
+    if ver >= 2:
+        lay["soffs"] = off
+        off = align(off + 4 * nstr)
+    lay["strtab"] = (off, slen)
+    off += slen
+    cols = []
+    for code in _STATIC_BIN_COLS:
+        off = align(off)
+        cols.append(off)
+        off += array(code).itemsize * n
+    if off > len(buf):
+        raise ValueError("static.bin: truncated columns")
+    lay["cols"] = cols
+    return lay
+
+def _static_bin_column(buf, lay: dict, k: int) -> array:
+    code = _STATIC_BIN_COLS[k]
+    a = array(code)
+    off = lay["cols"][k]
+    a.frombytes(buf[off:off + a.itemsize * lay["n"]])
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+def _decode_static_bin(buf: bytes) -> dict:
+    """Inverse of _encode_static_bin (eager: every track becomes a dict)."""
+    mv = memoryview(buf)
+    lay = _static_bin_layout(mv)
+    off, mlen = lay["meta"]
+    data = json.loads(bytes(mv[off:off + mlen]).decode("utf-8"))
+    off, slen = lay["strtab"]
+    S = bytes(mv[off:off + slen]).decode("utf-8").split("\0")
+    cols = [_static_bin_column(mv, lay, k) for k in range(len(_STATIC_BIN_COLS))]
+    data["tracks"] = [
+        {"path": S[d] + S[nm], "title": S[ti], "folder": S[fo], "size": sz, "mtime": mt,
+         "duration_ms": du if du >= 0 else None, "id": S[i] or None}
+        for d, nm, ti, fo, i, sz, mt, du in zip(*cols)
+    ]
+    return data
+
+
+class _TrackTable:
+    """Read-only, lazily decoded view of a v2 static.bin.
+
+    The file is memory-mapped (read into memory on Windows, where a mapped
+    file cannot be replaced by the next static write). Numeric columns are
+    copied out as arrays; strings stay encoded until a row asks for them.
+    """
+
+    def __init__(self, path: Path, root: Optional[str] = None):
+        import mmap
+        with open(path, "rb") as f:
+            if os.name == "nt":
+                buf = f.read()
+            else:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = buf
+        lay = _static_bin_layout(buf)
+        if lay["version"] < 2:
+            raise ValueError("static.bin: v1 has no string offsets")
+        off, mlen = lay["meta"]
+        self.meta = json.loads(bytes(buf[off:off + mlen]).decode("utf-8"))
+        self.n = lay["n"]
+        self._str0, _ = lay["strtab"]
+        soffs = array(_U32)
+        soffs.frombytes(buf[lay["soffs"]:lay["soffs"] + 4 * lay["n_strings"]])
+        if sys.byteorder == "big":
+            soffs.byteswap()
+        soffs.append(lay["strtab"][1] + 1)
+        self._soffs = soffs
+        (self.c_dir, self.c_name, self.c_title, self.c_folder, self.c_id,
+         self.c_size, self.c_mtime, self.c_dur) = [_static_bin_column(buf, lay, k) for k in range(len(_STATIC_BIN_COLS))]
+        self._strs: Dict[int, str] = {}
+        self._dir_folder: Dict[int, str] = {}
+        self._dir_abs: Dict[int, str] = {}
+        root = root or self.meta.get("base_folder") or ""
+        self._prefix = _root_prefix(root) if root else ""
+        self._rebase = None if self.meta.get("paths") == "relative" else _rebase_fn(root, self.meta)
+
+    @property
+    def table(self) -> "_TrackTable":      # same interface as _Shard for _LazyItems segments
+        return self
+
+    def dir_path(self, dsid: int) -> str:
+        """Absolute directory prefix (with trailing separator) of dir string `dsid`."""
+        d = self._dir_abs.get(dsid)
+        if d is None:
+            d = self.s(dsid)
+            if self._rebase is not None:
+                d = self._rebase(d) if d else d
+            d = self._dir_abs[dsid] = _abs_path(self._prefix, d) if self._prefix else d
+        return d
+
+    def s(self, sid: int) -> str:
+        v = self._strs.get(sid)
+        if v is None:
+            a = self._str0 + self._soffs[sid]
+            v = bytes(self._buf[a:self._str0 + self._soffs[sid + 1] - 1]).decode("utf-8")
+            if len(self._strs) < 65536:
+                self._strs[sid] = v
+        return v
+
+    def folder_of_dir(self, dsid: int) -> str:
+        f = self._dir_folder.get(dsid)
+        if f is None:
+            f = self._dir_folder[dsid] = os.path.basename(self.dir_path(dsid).rstrip("/\\"))
+        return f
+
+    def item(self, r: int) -> Dict:
+        """Row r as the same item dict _items_from_static builds."""
+        name = self.s(self.c_name[r])
+        du = self.c_dur[r]
+        return {"path": self.dir_path(self.c_dir[r]) + name,
+                "name": self.s(self.c_title[r]) or os.path.splitext(name)[0],
+                "folder": self.folder_of_dir(self.c_dir[r]),
+                "size": self.c_size[r], "mtime": self.c_mtime[r],
+                "duration_ms": du if du >= 0 else None,
+                "id": self.s(self.c_id[r]) or None}
+
+    def value(self, r: int, field: str):
+        """One item field of row r without building the row dict."""
+        if field == "name":
+            return self.s(self.c_title[r]) or os.path.splitext(self.s(self.c_name[r]))[0]
+        if field == "duration_ms":
+            du = self.c_dur[r]
+            return du if du >= 0 else None
+        return {"size": self.c_size, "mtime": self.c_mtime}[field][r]
+
+    def find_string(self, value: str) -> Optional[int]:
+        """String index of `value`, found with a byte search of the table."""
+        needle = value.encode("utf-8") + b"\0"
+        a, end = self._str0, self._str0 + self._soffs[-1]
+        pos = a
+        while True:
+            pos = self._buf.find(needle, pos, end)
+            if pos < 0:
+                return None
+            rel = pos - a
+            if rel == 0 or self._buf[pos - 1] == 0:
+                k = bisect_right(self._soffs, rel) - 1
+                if self._soffs[k] == rel:
+                    return k
+            pos += 1
+
+
+class _Shard:
+    """One per-directory cache file of a sharded library (.prajna_static/).
+    Opened on first access; `n` and `folder` come from the manifest."""
+
+    def __init__(self, path: Path, n: int, rel: str, folder: str, root: str):
+        self.path, self.n, self.rel, self.folder, self.root = path, n, rel, folder, root
+        self._table: Optional[_TrackTable] = None
+
+    @property
+    def table(self) -> "_TrackTable":
+        if self._table is None:
+            t = _TrackTable(self.path, root=self.root)
+            if t.n != self.n:
+                raise ValueError(f"shard {self.path.name}: {t.n} rows, manifest says {self.n}")
+            self._table = t
+        return self._table
+
+
+class _LazyItems:
+    """Stand-in for the items_all list over one or more _TrackTables.
+
+    Row i is turned into the usual item dict the first time it is indexed and
+    kept, so in-place edits (durations) stick. Iteration yields rows without
+    keeping them. `segs` is a list of (source, rows): a _TrackTable or a not
+    yet opened _Shard, and an optional array selecting/ordering its rows.
+    `extra` holds plain item dicts appended after them (e.g. new files found
+    by the scan); together they form the storage order. `perm` (set by
+    sorted_by) maps playlist positions to storage indices. `order` is the sort
+    mode the rows are known to be in; `_head_order` is (mode, n) when only the
+    first n positions are (extra rows appended after a sorted list).
+    """
+
+    def __init__(self, segs, extra: Optional[List[Dict]] = None, order: Optional[str] = None,
+                 perm: Optional[array] = None):
+        if isinstance(segs, _TrackTable):
+            order = segs.meta.get("order") if not extra else None
+            segs = [(segs, None)]
+        self.segs = list(segs)
+        self.extra = list(extra or [])
+        self.order = order
+        self.perm = perm
+        self._inv: Optional[array] = None
+        self._starts = [0]
+        for src, rows in self.segs:
+            self._starts.append(self._starts[-1] + (len(rows) if rows is not None else src.n))
+        self._cache: Dict[int, Dict] = {}      # storage index -> materialized row
+        self._extra_at: Optional[Dict[int, int]] = None     # id(extra dict) -> offset in extra
+        self._head_order: Tuple[Optional[str], int] = (None, 0)
+
+    def __len__(self):
+        return self._starts[-1] + len(self.extra)
+
+    def _pos(self, b: int) -> int:
+        """Playlist position of storage index b."""
+        if self.perm is None:
+            return b
+        if self._inv is None:
+            self._inv = array(_U32, bytes(4 * len(self.perm)))
+            for i, x in enumerate(self.perm):
+                self._inv[x] = i
+        return self._inv[b]
+
+    def index_of_extra(self, it: Dict) -> Optional[int]:
+        """Playlist position of the `extra` dict `it` (by identity); table rows
+        are not looked at."""
+        if self._extra_at is None:
+            self._extra_at = {id(d): k for k, d in enumerate(self.extra)}
+        k = self._extra_at.get(id(it))
+        if k is None or self.extra[k] is not it:
+            return None
+        return self._pos(self._starts[-1] + k)
+
+    def _locate(self, i: int):
+        k = bisect_right(self._starts, i) - 1
+        src, rows = self.segs[k]
+        j = i - self._starts[k]
+        return src, rows[j] if rows is not None else j
+
+    def _row(self, i: int) -> Dict:
+        it = self._cache.get(i)
+        if it is None:
+            src, r = self._locate(i)
+            it = src.table.item(r)
+        return it
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if self.perm is not None:
+            i = self.perm[i]
+        nr = self._starts[-1]
+        if i >= nr:
+            return self.extra[i - nr]
+        it = self._cache.get(i)
+        if it is None:
+            src, r = self._locate(i)
+            it = self._cache[i] = src.table.item(r)
+        return it
+
+    def __iter__(self):
+        nr = self._starts[-1]
+        for b in (self.perm if self.perm is not None else range(len(self))):
+            yield self._row(b) if b < nr else self.extra[b - nr]
+
+    def __add__(self, other: List[Dict]) -> "_LazyItems":
+        other = list(other)
+        perm = None
+        if self.perm is not None:
+            perm = array(_U32, self.perm)
+            perm.extend(range(len(self), len(self) + len(other)))
+        out = _LazyItems(self.segs, self.extra + other, perm=perm)
+        out._cache = self._cache
+        out._head_order = (self.order, len(self)) if self.order else self._head_order
+        return out
+
+    def _sort_key(self, field: str, reverse: bool):
+        nr = self._starts[-1]
+        def key(b: int):
+            if b >= nr:
+                return _sort_value(field, self.extra[b - nr][field], reverse)
+            it = self._cache.get(b)
+            if it is not None:
+                return _sort_value(field, it[field], reverse)
+            src, r = self._locate(b)
+            return _sort_value(field, src.table.value(r, field), reverse)
+        return key
+
+    def sorted_by(self, field: str, reverse: bool = False) -> "_LazyItems":
+        """Sorted view (same rows, new perm); keys come from the table columns,
+        so rows are not materialized. Stable like list.sort.
+
+        When the head of the playlist is already in this order and only a few
+        rows follow it, those are binary-searched into place, which reads the
+        keys (and opens the shards) of O(log n) rows each instead of all."""
+        mode, n0 = self._head_order
+        if mode is not None and SORT_SPECS.get(mode) == (field, reverse) and len(self) - n0 <= max(256, n0 // 8):
+            return self._merge_tail(field, reverse, n0)
+        nr = self._starts[-1]
+        keys = []
+        for k, (src, rows) in enumerate(self.segs):
+            t, base = src.table, self._starts[k]
+            for j, r in enumerate(rows if rows is not None else range(t.n)):
+                it = self._cache.get(base + j)
+                keys.append(_sort_value(field, it[field] if it is not None else t.value(r, field), reverse))
+        keys.extend(_sort_value(field, it[field], reverse) for it in self.extra)
+        cur = self.perm if self.perm is not None else range(nr + len(self.extra))
+        out = _LazyItems(self.segs, self.extra, perm=array(_U32, sorted(cur, key=keys.__getitem__, reverse=reverse)))
+        out._cache = self._cache
+        return out
+
+    def _merge_tail(self, field: str, reverse: bool, n0: int) -> "_LazyItems":
+        key = self._sort_key(field, reverse)
+        cur = self.perm if self.perm is not None else range(len(self))
+        head = array(_U32, cur[:n0])
+        perm, prev = array(_U32), 0
+        for b in sorted(cur[n0:], key=key, reverse=reverse):
+            kb, lo, hi = key(b), prev, n0
+            while lo < hi:      # after every head row that sorts before or equal to b (stable)
+                mid = (lo + hi) // 2
+                km = key(head[mid])
+                if (kb > km) if reverse else (kb < km):
+                    hi = mid
+                else:
+                    lo = mid + 1
+            perm.extend(head[prev:lo])
+            perm.append(b)
+            prev = lo
+        perm.extend(head[prev:])
+        out = _LazyItems(self.segs, self.extra, perm=perm)
+        out._cache = self._cache
+        return out
+
+    @property
+    def materialized(self) -> int:
+        return len(self._cache)
+
+    def split_dirs(self, root: str, keep_rel) -> Tuple["_LazyItems", List[Dict]]:
+        """(rows whose directory relative to root is in keep_rel, other rows as dicts),
+        in storage order. Shards are decided by their manifest entry without being opened."""
+        segs, rest = [], []
+        nr = self._starts[-1]
+        # storage index -> index in the result, so the playlist order (perm) carries over
+        moved = array("q", [-1]) * nr if self.perm is not None else None
+        n_out = 0
+        for k, (src, rows) in enumerate(self.segs):
+            base = self._starts[k]
+            if isinstance(src, _Shard) and rows is None:
+                if src.rel in keep_rel:
+                    segs.append((src, None))
+                    if moved is not None:
+                        moved[base:base + src.n] = array("q", range(n_out, n_out + src.n))
+                    n_out += src.n
+                else:
+                    rest.extend(self._row(base + j) for j in range(src.n))
+                continue
+            t = src.table
+            rows_k = rows if rows is not None else range(t.n)
+            keep_ids = set()
+            for dsid in set(t.c_dir[r] for r in rows_k):
+                d = t.dir_path(dsid).rstrip("/\\") or os.sep
+                if os.path.relpath(d, root).replace(os.sep, "/") in keep_rel:
+                    keep_ids.add(dsid)
+            keep = array(_U32)
+            for j, r in enumerate(rows_k):
+                if t.c_dir[r] in keep_ids:
+                    if moved is not None:
+                        moved[base + j] = n_out + len(keep)
+                    keep.append(r)
+                else:
+                    rest.append(self._row(base + j))
+            if keep:
+                segs.append((src, keep if len(keep) < len(rows_k) else rows))
+                n_out += len(keep)
+        out = _LazyItems(segs, order=self.order)     # a subset of sorted rows is still sorted
+        if moved is not None:
+            out.perm = self.perm if (n_out == nr and not self.extra) else array(
+                _U32, (x for x in (moved[b] for b in self.perm if b < nr) if x >= 0))
+        return out, rest + self.extra
+
+    def folders(self) -> set:
+        out = {it["folder"] for it in self.extra}
+        for src, rows in self.segs:
+            if isinstance(src, _Shard) and rows is None:
+                out.add(src.folder)
+            else:
+                t = src.table
+                out |= {t.folder_of_dir(d) for d in set(t.c_dir[r] for r in (rows if rows is not None else range(t.n)))}
+        return out
+
+    def indices_in_folder(self, folder: str) -> List[int]:
+        """Indices of rows whose folder is `folder`; other shards stay unopened."""
+        out = []
+        for k, (src, rows) in enumerate(self.segs):
+            base = self._starts[k]
+            if isinstance(src, _Shard) and rows is None:
+                if src.folder == folder:
+                    out.extend(range(base, base + src.n))
+                continue
+            t = src.table
+            for j, r in enumerate(rows if rows is not None else range(t.n)):
+                if t.folder_of_dir(t.c_dir[r]) == folder:
+                    out.append(base + j)
+        nr = self._starts[-1]
+        out.extend(nr + k for k, it in enumerate(self.extra) if it["folder"] == folder)
+        return sorted(self._pos(b) for b in out) if self.perm is not None else out
+
+    def find(self, path: str) -> Optional[int]:
+        """Index of `path` without materializing rows (byte search + column scan)."""
+        d, name = os.path.split(path)
+        for k, (src, rows) in enumerate(self.segs):
+            if isinstance(src, _Shard) and Path(_root_prefix(src.root) + (src.rel if src.rel != "." else "")) != Path(d):
+                continue        # only the shard of path's directory is opened
+            t = src.table
+            nsid = t.find_string(name)
+            if nsid is None:
+                continue
+            for j, r in enumerate(rows if rows is not None else range(t.n)):
+                if t.c_name[r] == nsid and Path(t.dir_path(t.c_dir[r]) + name) == Path(path):
+                    return self._pos(self._starts[k] + j)
+        for k, it in enumerate(self.extra):
+            if Path(it["path"]) == Path(path):
+                return self._pos(self._starts[-1] + k)
+        return None
+
+# ----- static.journal (append-only JSON lines replayed over the cache file) -----
+#   {"op": "add", "t": {track}}                       new/updated track
+#   {"op": "del", "path": p}                          track removed
+#   {"op": "dur", "path": p, "size", "mtime", "ms"}   duration learned (only if size/mtime still match)
+_STATIC_JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# Track paths are stored relative to the library root ("paths": "relative",
+# "/"-separated) so a cache survives the drive being mounted elsewhere.
+def _root_prefix(folder: str) -> str:
+    p = str(Path(folder))
+    return p if p.endswith(os.sep) else p + os.sep
+
+def _rel_path(prefix: str, path: str) -> str:
+    """`path` relative to the root `prefix`; paths outside the root stay absolute."""
+    if not path.startswith(prefix):
+        return path
+    rel = path[len(prefix):]
+    return rel.replace(os.sep, "/") if os.sep != "/" else rel
+
+def _abs_path(prefix: str, rel: str) -> str:
+    if os.path.isabs(rel):
+        return rel
+    return prefix + (rel.replace("/", os.sep) if os.sep != "/" else rel)
+
+def _rebase_fn(folder: str, data: dict):
+    """Map a stored path to its root-relative form. Legacy absolute paths are
+    matched against the current root first, then the recorded base_folder."""
+    prefixes = [_root_prefix(folder)]
+    base = data.get("base_folder")
+    if base and _root_prefix(base) != prefixes[0]:
+        prefixes.append(_root_prefix(base))
+    def rel(path: str) -> str:
+        for pre in prefixes:
+            if path.startswith(pre):
+                return _rel_path(pre, path)
+        return path
+    return rel
+
+def _static_track(it: Dict, prefix: Optional[str] = None) -> dict:
+    return {
+        "path": _rel_path(prefix, it["path"]) if prefix else it["path"],
+        "title": it["name"],
+        "folder": it["folder"],
+        "size": it.get("size", 0),
+        "mtime": it.get("mtime", 0),
+        "duration_ms": it.get("duration_ms"),
+        "id": it.get("id"),
+    }
+
+def _journal_dur(it: Dict) -> dict:
+    return {"op": "dur", "path": it["path"], "size": int(it.get("size", 0)),
+            "mtime": float(it.get("mtime", 0)), "ms": it["duration_ms"]}
+
+def _replay_static_journal(data: dict, jpath: Path, norm=None) -> int:
+    """Apply journal entries to data["tracks"] in place; returns how many applied.
+    Entries are idempotent, so replaying over an already-compacted cache is harmless.
+    `norm` maps entry paths to the form used by data["tracks"]."""
+    norm = norm or (lambda p: p)
+    try:
+        raw = jpath.read_bytes()
+    except OSError:
+        return 0
+    tracks = {t["path"]: t for t in data["tracks"]}
+    n = 0
+    for line in raw.splitlines():
+        try:
+            e = json.loads(line)
+            op = e["op"]
+            if op == "dur":
+                t = tracks.get(norm(e["path"]))
+                if t is not None and int(t.get("size") or 0) == e["size"] and abs(float(t.get("mtime") or 0) - e["mtime"]) < 1e-3:
+                    t["duration_ms"] = e["ms"]
+            elif op == "add":
+                e["t"]["path"] = norm(e["t"]["path"])
+                tracks[e["t"]["path"]] = e["t"]
+            elif op == "del":
+                tracks.pop(norm(e["path"]), None)
+            else:
+                continue
+        except (ValueError, KeyError, TypeError):
+            continue        # torn last line after a crash, or a foreign entry
+        n += 1
+    if n:
+        data["tracks"] = list(tracks.values())
+    return n
+
+# ----- Global media metadata cache -----
+class _MetaStore:
+    """SQLite cache of probed durations shared by every opened folder.
+
+    Keyed by (device, inode, size, mtime_ns) so a file reachable from two roots
+    (a parent folder and a subfolder) is probed once. Safe to call from the
+    probe pool threads; a NULL duration records "probed, unknown".
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS media ("
+            " dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER,"
+            " duration_ms INTEGER, path TEXT,"
+            " PRIMARY KEY (dev, ino, size, mtime_ns))")
+        self._db.commit()
+
+    @staticmethod
+    def key_for(path: str) -> Optional[Tuple[int, int, int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not st.st_ino:
+            return None   # filesystem without stable inode numbers
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def get(self, key) -> Tuple[bool, Optional[int]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT duration_ms FROM media WHERE dev=? AND ino=? AND size=? AND mtime_ns=?", key).fetchone()
+        return (True, row[0]) if row else (False, None)
+
+    def put_many(self, rows) -> None:
+        """rows: iterable of (key, duration_ms, path)."""
+        rows = [(*k, d, p) for k, d, p in rows]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            try: self._db.close()
+            except Exception: pass
+
+# ----- Consolidated state database -----
+class _StateDB:
+    """SQLite (WAL) store for per-folder playback state, recent folders and config.
+
+    Replaces the state_<hash>.json / state_id_<fid>.json files, state_recent.json
+    and prajna_config.json; the JSON files are imported once and left in place.
+    Folder state is looked up by static-cache folder_id, else by the folder string
+    as opened, so no path resolving or hashing. prajna_config.json is re-imported
+    whenever it is newer than the last import (hand edits still work).
+    Used from the Tk thread and the state writer thread.
+    """
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS folder_state ("
+            " folder TEXT PRIMARY KEY, folder_id TEXT, song TEXT, position INTEGER,"
+            " saved_at REAL, data TEXT);"
+            "CREATE INDEX IF NOT EXISTS folder_state_fid ON folder_state (folder_id);"
+            "CREATE TABLE IF NOT EXISTS recent (folder TEXT PRIMARY KEY, opened_at REAL);"
+            "CREATE INDEX IF NOT EXISTS recent_at ON recent (opened_at);"
+            "CREATE TABLE IF NOT EXISTS config (key TEXT PRIMARY KEY, value TEXT);"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);"
+            "CREATE TABLE IF NOT EXISTS track_pos (key TEXT PRIMARY KEY, path TEXT, position INTEGER,"
+            " last_played REAL);"
+            "CREATE INDEX IF NOT EXISTS track_pos_lru ON track_pos (last_played);")
+        self._db.commit()
+        self._track_puts = 0
+
+    def migrate_json(self, app_dir: Path) -> int:
+        """Import state_*.json and state_recent.json (first run only) -> folders imported."""
+        with self._lock:
+            if self._db.execute("PRAGMA user_version").fetchone()[0] >= self.VERSION:
+                return 0
+        rows = []
+        for p in app_dir.glob("state_*.json"):
+            if p.name == "state_recent.json":
+                continue
+            try:
+                data = json.loads(p.read_text(encoding="utf-8"))
+            except Exception:
+                continue
+            if isinstance(data, dict) and data.get("folder"):
+                fid = p.stem[len("state_id_"):] if p.stem.startswith("state_id_") else None
+                rows.append((data["folder"], fid, data))
+        rows.sort(key=lambda r: r[2].get("saved_at") or 0)     # legacy + id file of one folder: newest wins
+        fids = {folder: fid for folder, fid, _ in rows if fid}
+        try:
+            last = json.loads((app_dir / "state_recent.json").read_text(encoding="utf-8"))
+        except Exception:
+            last = None
+        with self._lock, self._db:
+            for folder, _, data in rows:
+                self._put_state(folder, fids.get(folder), data)
+                self._touch(folder, float(data.get("saved_at") or 0))
+            if isinstance(last, dict) and last.get("folder"):
+                self._touch(last["folder"], float(last.get("saved_at") or time.time()))
+            self._db.execute(f"PRAGMA user_version={self.VERSION}")
+        return len(rows)
+
+    # folder state
+    def _put_state(self, folder: str, fid: Optional[str], data: dict) -> None:
+        if fid:     # same library under a new name/mount: drop the old row
+            self._db.execute("DELETE FROM folder_state WHERE folder_id=? AND folder<>?", (fid, folder))
+        self._db.execute("INSERT OR REPLACE INTO folder_state VALUES (?, ?, ?, ?, ?, ?)",
+                         (folder, fid, data.get("song"), int(data.get("position") or 0),
+                          float(data.get("saved_at") or 0), json.dumps(data, ensure_ascii=False)))
+
+    def put_state(self, folder: str, fid: Optional[str], data: dict) -> None:
+        with self._lock, self._db:
+            self._put_state(folder, fid, data)
+
+    def get_state(self, folder: str, fid: Optional[str]) -> Optional[dict]:
+        with self._lock:
+            row = None
+            if fid:
+                row = self._db.execute("SELECT data FROM folder_state WHERE folder_id=?"
+                                       " ORDER BY saved_at DESC LIMIT 1", (fid,)).fetchone()
+            if row is None:
+                row = self._db.execute("SELECT data FROM folder_state WHERE folder=?", (folder,)).fetchone()
+        try:
+            return json.loads(row[0]) if row else None
+        except ValueError:
+            return None
+
+    # recent folders
+    def _touch(self, folder: str, t: float) -> None:
+        self._db.execute("INSERT INTO recent VALUES (?, ?) ON CONFLICT(folder)"
+                         " DO UPDATE SET opened_at=max(opened_at, excluded.opened_at)", (folder, t))
+
+    def touch_recent(self, folder: str, t: Optional[float] = None) -> None:
+        with self._lock, self._db:
+            self._touch(folder, time.time() if t is None else t)
+
+    def recent(self, n: int = 10) -> List[dict]:
+        """Last `n` opened folders with their resume track, newest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT r.folder, r.opened_at, s.song, s.position FROM recent r"
+                " LEFT JOIN folder_state s ON s.folder = r.folder"
+                " ORDER BY r.opened_at DESC LIMIT ?", (int(n),)).fetchall()
+        return [{"folder": f, "opened_at": t, "song": s, "position": p or 0} for f, t, s, p in rows]
+
+    # per-track resume positions (LRU by last_played)
+    TRACK_EVICT_EVERY = 64      # puts between eviction passes
+
+    def get_track_pos(self, key: str) -> Optional[int]:
+        with self._lock:
+            row = self._db.execute("SELECT position FROM track_pos WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put_track_pos(self, key: str, path: str, position: int, t: float, cap: int) -> None:
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO track_pos VALUES (?, ?, ?, ?)", (key, path, int(position), t))
+            self._track_puts += 1
+            if self._track_puts % self.TRACK_EVICT_EVERY == 1:
+                self._db.execute("DELETE FROM track_pos WHERE key IN (SELECT key FROM track_pos"
+                                 " ORDER BY last_played DESC LIMIT -1 OFFSET ?)", (max(0, int(cap)),))
+
+    # config
+    def load_config(self, json_path: Optional[Path] = None) -> dict:
+        with self._lock, self._db:
+            if json_path is not None:
+                try:
+                    mt = json_path.stat().st_mtime
+                except OSError:
+                    mt = None
+                row = self._db.execute("SELECT value FROM meta WHERE key='config_json_mtime'").fetchone()
+                if mt is not None and (row is None or float(row[0]) < mt):
+                    try:
+                        cfg = json.loads(json_path.read_text(encoding="utf-8"))
+                    except Exception:
+                        cfg = None
+                    if isinstance(cfg, dict):
+                        self._db.executemany("INSERT OR REPLACE INTO config VALUES (?, ?)",
+                                             [(k, json.dumps(v, ensure_ascii=False)) for k, v in cfg.items()])
+                    self._db.execute("INSERT OR REPLACE INTO meta VALUES ('config_json_mtime', ?)", (repr(mt),))
+            rows = self._db.execute("SELECT key, value FROM config").fetchall()
+        out = {}
+        for k, v in rows:
+            try: out[k] = json.loads(v)
+            except ValueError: pass
+        return out
+
+    def save_config(self, cfg: dict, keys=None) -> None:
+        """Store `cfg`; with `keys`, only those entries are upserted."""
+        rows = [(k, json.dumps(cfg[k], ensure_ascii=False)) for k in (cfg if keys is None else keys)]
+        with self._lock, self._db:
+            if keys is None:
+                self._db.execute("DELETE FROM config")
+            self._db.executemany("INSERT OR REPLACE INTO config VALUES (?, ?)", rows)
+
+    def close(self) -> None:
+        with self._lock:
+            try: self._db.close()
+            except Exception: pass
+
+# ----- Parsed subtitle cache -----
+class _CueCache:
+    """SQLite cache of parsed subtitle cues (_encode_cues blobs).
+
+    Keyed by subtitle path and valid only while (size, mtime_ns) and
+    SUB_PARSER_VERSION match, so replaying a talk skips decoding and parsing.
+    Bounded to max_bytes of blobs: inserts evict the least recently used rows.
+    """
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS cues ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, version INTEGER,"
+            " last_used REAL, nbytes INTEGER, blob BLOB);"
+            "CREATE INDEX IF NOT EXISTS cues_lru ON cues (last_used);")
+        self._db.commit()
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[bytes]:
+        with self._lock:
+            row = self._db.execute("SELECT blob FROM cues WHERE path=? AND size=? AND mtime_ns=? AND version=?",
+                                   (path, size, mtime_ns, SUB_PARSER_VERSION)).fetchone()
+            if row is not None:
+                with self._db:
+                    self._db.execute("UPDATE cues SET last_used=? WHERE path=?", (time.time(), path))
+        return row[0] if row else None
+
+    def put(self, path: str, size: int, mtime_ns: int, blob: bytes) -> None:
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO cues VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (path, size, mtime_ns, SUB_PARSER_VERSION, time.time(), len(blob), blob))
+            over = self._db.execute("SELECT COALESCE(SUM(nbytes), 0) FROM cues").fetchone()[0] - self.max_bytes
+            if over > 0:
+                doomed = []
+                for p, nb in self._db.execute("SELECT path, nbytes FROM cues ORDER BY last_used"):
+                    if over <= 0:
+                        break
+                    doomed.append((p,))
+                    over -= nb
+                self._db.executemany("DELETE FROM cues WHERE path=?", doomed)
+
+    def close(self) -> None:
+        with self._lock:
+            try: self._db.close()
+            except Exception: pass
+
+def _cached_probe(store: Optional[_MetaStore], path: str):
+    """Probe through the global store -> (duration_ms, new_row_or_None)."""
+    if store is None or os.path.splitext(path)[1].lower() not in AUDIO_EXTS:
+        return _probe_duration_ms(path), None
+    key = _MetaStore.key_for(path)
+    if key is not None:
+        try:
+            found, dur = store.get(key)
+            if found:
+                return dur, None
+        except Exception:
+            pass
+    dur = _probe_duration_ms(path)
+    return dur, ((key, dur, path) if key is not None else None)
+
+def _pid_alive(pid: int) -> bool:
+    """Is `pid` a running process on this machine? (os.kill(pid, 0) would
+    terminate the process on Windows, so ask the kernel32 API there.)"""
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        try:
+            import ctypes
+            k32 = ctypes.windll.kernel32
+            h = k32.OpenProcess(0x1000, False, pid)     # PROCESS_QUERY_LIMITED_INFORMATION
+            if not h:
+                return k32.GetLastError() == 5          # access denied -> exists
+            code = ctypes.c_ulong()
+            ok = k32.GetExitCodeProcess(h, ctypes.byref(code))
+            k32.CloseHandle(h)
+            return bool(ok) and code.value == 259       # STILL_ACTIVE
+        except Exception:
+            return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True     # EPERM: alive, owned by someone else
+    return True
+
+
 class _FileLock:
+    """Inter-process lock on `path` (static.lock).
+
+    Uses fcntl.flock where available: the kernel drops the lock when the
+    holder dies, so a crash never leaves a stale lock behind. Elsewhere an
+    O_EXCL lock file is used; it records "pid host time" and is broken at
+    once when the owner is no longer running on this host. On timeout the
+    caller proceeds unlocked, as before. Wait times are kept in
+    _FileLock.stats.
+    """
+    POLL = 0.02
+    STALE_UNKNOWN_SECS = 30.0       # unreadable owner record older than this is stale
+    stats = {"acquired": 0, "contended": 0, "wait_total": 0.0, "wait_max": 0.0,
+             "stale_broken": 0, "timeouts": 0}
+    _host = None
+
     def __init__(self, path: Path, timeout: float = 10.0):
         self.path = Path(path)
         self.timeout = timeout
         self._acquired = False
+        self._fd = None
+        self.waited = 0.0
+
+    @classmethod
+    def _hostname(cls) -> str:
+        if cls._host is None:
+            import socket
+            try: cls._host = socket.gethostname()
+            except Exception: cls._host = ""
+        return cls._host
+
+    @classmethod
+    def _owner_record(cls) -> bytes:
+        return f"{os.getpid()} {cls._hostname()} {time.time():.0f}\n".encode("utf-8")
+
+    def _try_flock(self) -> bool:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        try:
+            # The previous holder may have unlinked the file after we opened it
+            if os.fstat(fd).st_ino != os.stat(self.path).st_ino:
+                os.close(fd)
+                return False
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, self._owner_record())
+        self._fd = fd
+        return True
+
+    def _try_excl(self) -> bool:
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            if self._is_stale():
+                try:
+                    os.remove(self.path)
+                    _FileLock.stats["stale_broken"] += 1
+                    print(f"[Lock] removed stale lock {self.path}")
+                except OSError:
+                    pass
+            return False
+        try: os.write(fd, self._owner_record())
+        finally: os.close(fd)
+        return True
+
+    def _is_stale(self) -> bool:
+        try:
+            raw = self.path.read_bytes().decode("utf-8", "replace").split()
+            age = time.time() - self.path.stat().st_mtime
+        except OSError:
+            return False
+        if len(raw) >= 2 and raw[0].isdigit() and raw[1] == self._hostname():
+            return not _pid_alive(int(raw[0]))
+        return age > self.STALE_UNKNOWN_SECS    # foreign host or half-written record
+
     def __enter__(self):
-        t0 = time.time()
+        t0 = time.perf_counter()
+        attempt = self._try_flock if fcntl is not None else self._try_excl
         while True:
             try:
-                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-                os.close(fd)
-                self._acquired = True
-                break
-            except FileExistsError:
-                if time.time() - t0 > self.timeout:
+                if attempt():
+                    self._acquired = True
                     break
-                time.sleep(0.1)
+            except OSError:
+                if attempt == self._try_flock:     # e.g. flock unsupported on this FS
+                    attempt = self._try_excl
+                    continue
+                break                              # read-only folder etc.: cannot lock at all
+            if time.perf_counter() - t0 > self.timeout:
+                _FileLock.stats["timeouts"] += 1
+                print(f"[Lock] timed out after {self.timeout:.1f}s on {self.path}; writing unlocked")
+                break
+            time.sleep(self.POLL)
+        self.waited = time.perf_counter() - t0
+        st = _FileLock.stats
+        st["acquired"] += self._acquired
+        if self.waited > self.POLL:
+            st["contended"] += 1
+        st["wait_total"] += self.waited
+        st["wait_max"] = max(st["wait_max"], self.waited)
         return self
+
     def __exit__(self, exc_type, exc, tb):
-        if self._acquired:
-            try: os.remove(self.path)
+        if not self._acquired:
+            return
+        try: os.remove(self.path)
+        except Exception: pass
+        if self._fd is not None:
+            try: os.close(self._fd)       # releases the flock
             except Exception: pass
+            self._fd = None
+
+class _CoalescingWriter:
+    """One background thread that runs deferred write jobs.
+
+    submit(key, fn, delay) schedules fn about `delay` seconds later; submitting
+    again for a key that is still pending replaces its job but keeps the
+    original deadline, so a burst of requests turns into a single write.
+    flush()/close() run everything pending immediately and wait for it.
+    """
+
+    def __init__(self, name: str = "prajna-writer"):
+        self._cv = threading.Condition()
+        self._pending: Dict[object, list] = {}     # key -> [deadline, fn]
+        self._busy = False
+        self._closed = False
+        self.stats = {"submitted": 0, "coalesced": 0, "written": 0, "errors": 0}
+        threading.Thread(target=self._run, name=name, daemon=True).start()
+
+    def submit(self, key, fn, delay: float = 0.0) -> None:
+        with self._cv:
+            if self._closed:
+                return
+            self.stats["submitted"] += 1
+            cur = self._pending.get(key)
+            if cur is not None:
+                cur[1] = fn
+                self.stats["coalesced"] += 1
+            else:
+                self._pending[key] = [time.monotonic() + delay, fn]
+                self._cv.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while True:
+                    now = time.monotonic()
+                    due = [k for k, (t, _) in self._pending.items() if t <= now]
+                    if due:
+                        break
+                    if self._closed:
+                        return
+                    nxt = min((t for t, _ in self._pending.values()), default=None)
+                    self._cv.wait(None if nxt is None else nxt - now)
+                jobs = [(k, self._pending.pop(k)[1]) for k in due]
+                self._busy = True
+            for key, fn in jobs:
+                try:
+                    fn()
+                    self.stats["written"] += 1
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    print(f"[Writer] {key}: {e}")
+            with self._cv:
+                self._busy = False
+                self._cv.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Run pending jobs now; True once everything has been written."""
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._cv:
+            for v in self._pending.values():
+                v[0] = 0.0
+            self._cv.notify_all()
+            while self._pending or self._busy:
+                left = None if end is None else end - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._cv.wait(left)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        ok = self.flush(timeout)
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+        return ok
 
 # ----- Main App -----
 class PrajnaPlayerApp:
+    TREE_CHUNK = 2000       # playlist rows inserted per batch (see _fill_tree_more)
+    STATIC_WRITE_DELAY = 1.5    # seconds static writes are held back to coalesce
+    STATE_WRITE_DELAY = 0.5     # same for state_*.json / state_recent.json (rapid track skipping)
+    CONFIG_FLUSH_MS = 2000      # quiet time before dirty config is written (see _mark_config_dirty)
+    TRACK_POS_MIN_MS = 5000     # per-track resume: positions this close to either end restart the track
+    TRACK_POS_HOT = 64          # entries of _track_pos_hot
+
     def __init__(self, root: tk.Tk):
         self.root = root
 
@@ -823,14 +2459,27 @@ class PrajnaPlayerApp:
         # migrate JSONs from runtime root (or old location) to config_state/
         self._migrate_old_jsons(_runtime_dir(), self.app_dir)
 
-        # Config path (in config_state/)
+        # Config path (in config_state/); state, recent folders and config live in
+        # prajna_state.sqlite3 when sqlite3 is available (JSON files are migrated)
         self.config_path = self.app_dir / "prajna_config.json"
+        self.state_db: Optional[_StateDB] = None
+        if sqlite3 is not None:
+            try:
+                self.state_db = _StateDB(self.app_dir / "prajna_state.sqlite3")
+                self.state_db.migrate_json(self.app_dir)
+            except Exception:
+                self.state_db = None
         self._cfg = self._load_config()
+        self._cfg_saved = json.loads(json.dumps(self._cfg))    # what is on disk (see _save_config)
+        self._cfg_flush_job = None
 
         # Flags / timers
         self.allow_write_static = tk.BooleanVar(value=bool(self._cfg.get("allow_write_static", True)))
         self.state_autosave_interval = int(self._cfg.get("state_autosave_ms", 30000))
         self._last_state_save = 0.0
+        self.track_history_max = int(self._cfg.get("track_history_max", 5000))   # per-track resume (0 = off)
+        self._track_pos_hot: "OrderedDict[str, int]" = OrderedDict()   # recent puts, ahead of the DB
+        self._playing_item: Optional[Dict] = None   # track loaded by _play_index (items_all may be re-sorted/replaced since)
 
         # Data
         self.items_all: List[Dict] = []
@@ -840,6 +2489,51 @@ class PrajnaPlayerApp:
         self.is_shuffle = False
         self.current_folder: Optional[str] = None
 
+        self._path_index: Optional[Dict[str, int]] = {}
+        self._id_index: Optional[Dict[str, int]] = {}
+        self._items_order: Optional[str] = None    # sort mode items_all is known to be in
+        self._tree_filled = 0                      # items_view rows inserted into the playlist
+        self._folder_id: Optional[str] = None      # static.json folder_id of current_folder
+        self._folder_id_saved = False
+        self._song_hash: Tuple[str, Optional[str]] = ("", None)
+        self._journal_lock = threading.Lock()
+        self._static_seq = 0                       # payload snapshot counter (see _commit_static)
+        self._static_seq_written: Dict[str, int] = {}
+        self._writer = _CoalescingWriter("prajna-writer")     # static cache writes (see _write_static)
+        self._state_writer = _CoalescingWriter("prajna-state")  # write-behind state files (see _save_state_now)
+        self._dir_fingerprints: Dict[str, dict] = {}
+        self._scanned_at = 0.0
+
+        # Background jobs (probe pool → UI) drained by _drain_q
+        self.q: "queue.Queue" = queue.Queue()
+        self._scan_gen = 0
+        self._probe_cancel: Optional[threading.Event] = None
+        self._scan_cancel: Optional[threading.Event] = None
+        self._scan_on_done = None
+        self._scan_rescan = False
+        self._scan_progress = {"t0": 0.0, "seen": 0, "probed": 0, "probe_total": 0, "phase": "walk"}
+        self.probe_workers = int(self._cfg.get("probe_workers", 4))
+        # "bin" = compact static.bin (static.json is migrated on first open), "json" = legacy,
+        # "shards" = one cache per directory under .prajna_static/ (large recursive libraries)
+        fmt = self._cfg.get("static_format")
+        self.static_format = fmt if fmt in ("json", "shards") else "bin"
+        self.meta_store: Optional[_MetaStore] = None
+        if sqlite3 is not None and self._cfg.get("global_meta_cache", True):
+            try:
+                self.meta_store = _MetaStore(self.app_dir / "media_cache.sqlite3")
+            except Exception:
+                self.meta_store = None
+        self.cue_cache: Optional[_CueCache] = None
+        cue_mb = int(self._cfg.get("cue_cache_mb", 64))
+        if sqlite3 is not None and cue_mb > 0:
+            try:
+                self.cue_cache = _CueCache(self.app_dir / "cue_cache.sqlite3", cue_mb * 1_000_000)
+            except Exception:
+                self.cue_cache = None
+        self.watch_enabled = tk.BooleanVar(value=bool(self._cfg.get("watch_folder", False)))
+        self.watch_interval_ms = int(self._cfg.get("watch_interval_ms", 3000))
+        self._watch_stop: Optional[threading.Event] = None
+
         # Sub-index
         self.sub_index: Dict[str, Dict[str, Path]] = {}
 
@@ -847,8 +2541,8 @@ class PrajnaPlayerApp:
         self.sub_enabled = tk.BooleanVar(value=True)
         self.sub_en_file: Optional[Path] = None
         self.sub_vi_file: Optional[Path] = None
-        self.sub_en_cues: List[Tuple[int, int, str]] = []
-        self.sub_vi_cues: List[Tuple[int, int, str]] = []
+        self.sub_en_cues = CueTrack()
+        self.sub_vi_cues = CueTrack()
         self._last_en_text = ""
         self._last_vi_text = ""
         self.sub_delay_ms = tk.IntVar(value=int(self._cfg.get("sub_delay_ms", 0)))
@@ -857,6 +2551,9 @@ class PrajnaPlayerApp:
         self.sub_linger_ms   = tk.IntVar(value=int(self._cfg.get("sub_linger_ms",   800)))
         self.sub_min_hold_ms = tk.IntVar(value=int(self._cfg.get("sub_min_hold_ms", 1200)))
         self.sub_per_char_ms = tk.IntVar(value=int(self._cfg.get("sub_per_char_ms", 28)))
+        self._hold_params = (self.sub_linger_ms.get(), self.sub_min_hold_ms.get(), self.sub_per_char_ms.get())
+        for var in (self.sub_linger_ms, self.sub_min_hold_ms, self.sub_per_char_ms):
+            var.trace_add("write", self._on_hold_params_changed)   # re-derive CueTrack.eff_ends
 
         # VLC end guard
         self._end_fired = False
@@ -868,6 +2565,8 @@ class PrajnaPlayerApp:
         self.volume = tk.IntVar(value=int(self._cfg.get("volume", 70)))
         self.playback_rate = tk.DoubleVar(value=float(self._cfg.get("playback_rate", 1.0)))
         self.now_playing_var = tk.StringVar(value="")  # UI: show current track
+        self.scan_status_var = tk.StringVar(value="")  # UI: last scan summary / timings
+        self.scan_stats: dict = {}
 
         saved_panels = self._cfg.get("panel_visibility", {})
         if not isinstance(saved_panels, dict):
@@ -918,8 +2617,14 @@ class PrajnaPlayerApp:
             try: self.root.geometry(geo)
             except Exception: pass
 
+        # Config dirty tracking (see _save_config)
+        for var in (self.volume, self.playback_rate, self.sub_delay_ms, self.sub_linger_ms,
+                    self.sub_min_hold_ms, self.sub_per_char_ms, self.allow_write_static, self.watch_enabled):
+            var.trace_add("write", self._mark_config_dirty)
+
         # periodic
         self.root.after(300, self._tick)
+        self.root.after(100, self._drain_q)
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # Restore session
@@ -942,28 +2647,69 @@ class PrajnaPlayerApp:
 
     # --- Config ---
     def _load_config(self) -> dict:
+        if self.state_db is not None:
+            try:
+                return self.state_db.load_config(self.config_path)
+            except Exception:
+                pass
         try:
             if self.config_path.exists():
                 return json.loads(self.config_path.read_text(encoding="utf-8"))
         except Exception:
             pass
         return {}
+    def _config_snapshot(self) -> dict:
+        cfg = dict(self._cfg)
+        cfg["sub_font_size"]   = int(self.sub_font.cget("size"))
+        cfg["volume"]          = int(self.volume.get())
+        cfg["playback_rate"]   = float(self.playback_rate.get())
+        cfg["sub_delay_ms"]    = int(self.sub_delay_ms.get())
+        cfg["sub_linger_ms"]   = int(self.sub_linger_ms.get())
+        cfg["sub_min_hold_ms"] = int(self.sub_min_hold_ms.get())
+        cfg["sub_per_char_ms"] = int(self.sub_per_char_ms.get())
+        cfg["geometry"]        = self.root.geometry()
+        cfg["allow_write_static"] = bool(self.allow_write_static.get())
+        cfg["state_autosave_ms"]  = int(self.state_autosave_interval)
+        cfg["track_history_max"]  = int(self.track_history_max)
+        cfg["probe_workers"]      = int(self.probe_workers)
+        cfg["static_format"]      = self.static_format
+        cfg["global_meta_cache"]  = bool(self._cfg.get("global_meta_cache", True))
+        cfg["cue_cache_mb"]       = int(self._cfg.get("cue_cache_mb", 64))
+        cfg["watch_folder"]       = bool(self.watch_enabled.get())
+        cfg["watch_interval_ms"]  = int(self.watch_interval_ms)
+        cfg["panel_visibility"]   = dict(self._panel_visible)
+        return cfg
+
+    def _mark_config_dirty(self, *_):
+        """Coalesce config changes (slider drags, font bumps, window moves) into
+        one _save_config CONFIG_FLUSH_MS after the last change."""
+        if self._cfg_flush_job is not None:
+            try: self.root.after_cancel(self._cfg_flush_job)
+            except Exception: pass
+        self._cfg_flush_job = self.root.after(self.CONFIG_FLUSH_MS, self._save_config)
+
     def _save_config(self):
+        """Write the config keys that changed since the last write; unchanged
+        config never touches the disk. The write runs on the state writer."""
+        if self._cfg_flush_job is not None:
+            try: self.root.after_cancel(self._cfg_flush_job)
+            except Exception: pass
+            self._cfg_flush_job = None
         try:
-            self._cfg["sub_font_size"]   = int(self.sub_font.cget("size"))
-            self._cfg["volume"]          = int(self.volume.get())
-            self._cfg["playback_rate"]   = float(self.playback_rate.get())
-            self._cfg["sub_delay_ms"]    = int(self.sub_delay_ms.get())
-            self._cfg["sub_linger_ms"]   = int(self.sub_linger_ms.get())
-            self._cfg["sub_min_hold_ms"] = int(self.sub_min_hold_ms.get())
-            self._cfg["sub_per_char_ms"] = int(self.sub_per_char_ms.get())
-            self._cfg["geometry"]        = self.root.geometry()
-            self._cfg["allow_write_static"] = bool(self.allow_write_static.get())
-            self._cfg["state_autosave_ms"]  = int(self.state_autosave_interval)
-            self._cfg["panel_visibility"]   = dict(self._panel_visible)
-            self.config_path.write_text(json.dumps(self._cfg, ensure_ascii=False, indent=2), encoding="utf-8")
+            cfg = json.loads(json.dumps(self._config_snapshot()))
         except Exception:
-            pass
+            return
+        changed = [k for k in cfg if k not in self._cfg_saved or self._cfg_saved[k] != cfg[k]]
+        if not changed:
+            return
+        # _cfg is mutated in place (_save_image_path), so the on-disk copy must
+        # not share any dicts with it.
+        self._cfg, self._cfg_saved = cfg, json.loads(json.dumps(cfg))
+        if self.state_db is not None:
+            job = lambda: self.state_db.save_config(cfg, keys=changed)
+        else:
+            job = lambda: _atomic_write_json(self.config_path, cfg)
+        self._state_writer.submit("config", job, delay=0.0)
 
     # --- Title ---
     # def _update_title(self):
@@ -1065,6 +2811,7 @@ class PrajnaPlayerApp:
             self.top_panel_host.grid()
         else:
             self.top_panel_host.grid_remove()
+        self._mark_config_dirty()
         if refresh:
             self._refresh_panel_toggle_buttons()
 
@@ -1074,6 +2821,7 @@ class PrajnaPlayerApp:
             self.bottom_panel_host.grid()
         else:
             self.bottom_panel_host.grid_remove()
+        self._mark_config_dirty()
         if refresh:
             self._refresh_panel_toggle_buttons()
 
@@ -1092,6 +2840,7 @@ class PrajnaPlayerApp:
                     self.hero.forget(self.p_left)
                 except Exception:
                     pass
+        self._mark_config_dirty()
         if refresh:
             self._refresh_panel_toggle_buttons()
 
@@ -1110,6 +2859,7 @@ class PrajnaPlayerApp:
                     self.hero.forget(self.p_right)
                 except Exception:
                     pass
+        self._mark_config_dirty()
         if refresh:
             self._refresh_panel_toggle_buttons()
 
@@ -1186,6 +2936,7 @@ class PrajnaPlayerApp:
         new_size = max(10, min(56, int(self.sub_font.cget("size")) + delta))
         self.sub_font.configure(size=new_size)
         self._relayout_sub_labels()
+        self._mark_config_dirty()
 
     def _refresh_speed_label(self):
         try:
@@ -1447,9 +3198,9 @@ class PrajnaPlayerApp:
         self.tv.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.tv.bind("<Double-1>", lambda e: self.play_selected())
 
-        sb = ttk.Scrollbar(self.playlist_wrap, orient="vertical", command=self.tv.yview)
+        sb = self._tree_sb = ttk.Scrollbar(self.playlist_wrap, orient="vertical", command=self.tv.yview)
         sb.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tv.configure(yscrollcommand=sb.set)
+        self.tv.configure(yscrollcommand=self._on_tree_yscroll)
 
     def _populate_left_controls(self, parent):
         holder = ttk.Frame(parent)
@@ -1460,10 +3211,25 @@ class PrajnaPlayerApp:
         lib = self.left_section_library.body
         btn_open = tk.Button(lib, text="Open Folder [Ctrl+O]", command=self.open_folder)
         btn_open_json = tk.Button(lib, text="Open static.json [Ctrl+J]", command=self.open_static_file)
+        btn_recent = tk.Button(lib, text="Open Recent…", command=lambda: self._show_recent_menu(btn_recent))
         btn_rescan = tk.Button(lib, text="Rescan [F5]", command=self.rescan_current_folder)
-        for r, (b, role) in enumerate(((btn_open, "primary"), (btn_open_json, "secondary"), (btn_rescan, "accent"))):
+        for r, (b, role) in enumerate(((btn_open, "primary"), (btn_recent, "secondary"), (btn_open_json, "secondary"),
+                                       (btn_rescan, "accent"))):
             style_btn(b, role=role)
             b.grid(row=r, column=0, padx=2, pady=4, sticky="ew")
+        self.scan_progress_frame = ttk.Frame(lib)
+        self.scan_progressbar = ttk.Progressbar(self.scan_progress_frame, mode="indeterminate", length=140)
+        self.scan_progressbar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        btn_cancel = tk.Button(self.scan_progress_frame, text="Cancel", command=self.cancel_scan)
+        style_btn(btn_cancel, role="system")
+        btn_cancel.pack(side=tk.LEFT, padx=(4, 0))
+        self.scan_progress_frame.grid(row=4, column=0, padx=2, pady=(0, 4), sticky="ew")
+        self.scan_progress_frame.grid_remove()
+        self.scan_status_lbl = ttk.Label(lib, textvariable=self.scan_status_var, font=("Arial", 9), wraplength=220)
+        self.scan_status_lbl.grid(row=5, column=0, padx=2, pady=(0, 4), sticky="w")
+        chk_watch = tk.Checkbutton(lib, text="Watch folder", bg=BG, activebackground=BG, variable=self.watch_enabled,
+                                   onvalue=True, offvalue=False, command=self._toggle_watch)
+        chk_watch.grid(row=6, column=0, padx=2, pady=(0, 4), sticky="w")
         lib.grid_columnconfigure(0, weight=1)
 
         self.left_section_view = CollapsibleSection(holder, "View", open_=True)
@@ -1571,7 +3337,7 @@ class PrajnaPlayerApp:
         return None
 
     def _save_image_path(self, p: Path):
-        self._cfg["center_image"] = str(p); self._save_config()
+        self._cfg["center_image"] = str(p); self._mark_config_dirty()
 
     def _load_center_image(self, parent):
         if Image is None or ImageTk is None:
@@ -1631,18 +3397,10 @@ class PrajnaPlayerApp:
         self._set_center_image(p)
 
     # --- Sub-index builders ---
-    def _build_sub_index(self, root: Path):
-        idx: Dict[str, Dict[str, Path]] = {}
-        for p in root.rglob("*"):
-            base = _suffix2_base(p)
-            if not base:
-                continue
-            lang = _suffix2_lang(p)
-            if lang not in ("en", "vi"):
-                continue
-            d = idx.setdefault(base, {})
-            d[lang] = p
-        self.sub_index = idx
+    def _build_sub_index(self, root: Path, subs: Optional[List[Path]] = None):
+        if subs is None:
+            subs = _walk_library(root)["subs"]
+        self.sub_index = _sub_index_from_paths(subs)
 
     def _index_find_exact(self, base: str) -> Tuple[Optional[Path], Optional[Path]]:
         d = self.sub_index.get(base)
@@ -1661,50 +3419,261 @@ class PrajnaPlayerApp:
     def _static_path_for(self, folder: str) -> Path:
         return Path(folder) / "static.json"
 
-    def _read_static(self, folder: str) -> Optional[dict]:
-        try:
-            p = self._static_path_for(folder)
-            if not p.exists(): return None
-            data = json.loads(p.read_text(encoding="utf-8"))
-            if isinstance(data, dict) and "tracks" in data and isinstance(data["tracks"], list):
-                return data
-        except Exception:
-            return None
+    def _static_bin_path_for(self, folder: str) -> Path:
+        return Path(folder) / "static.bin"
+
+    def _static_manifest_path_for(self, folder: str) -> Path:
+        return Path(folder) / _STATIC_SHARD_DIR / "manifest.json"
+
+    def _static_exists(self, folder: str) -> bool:
+        return any(p.exists() for p in (self._static_bin_path_for(folder), self._static_path_for(folder),
+                                         self._static_manifest_path_for(folder)))
+
+    def _read_static(self, folder: str, lazy: bool = False) -> Optional[dict]:
+        """Load the folder cache from whichever of static.bin, static.json or the
+        shard manifest was written last (an older build may have written
+        static.json), with static.journal replayed on top. data["_format"] tells
+        which one was used, data["_journal"] how many entries were replayed.
+        lazy=True returns data["tracks"] as _LazyItems when there is no journal."""
+        found = []
+        for rank, (fmt, p) in enumerate((("bin", self._static_bin_path_for(folder)),
+                                         ("shards", self._static_manifest_path_for(folder)),
+                                         ("json", self._static_path_for(folder)))):
+            try: found.append((-p.stat().st_mtime, rank, fmt, p))
+            except OSError: pass
+        lazy = lazy and not self._static_journal_path_for(folder).exists()
+        for _, _, fmt, p in sorted(found):
+            try:
+                if fmt == "bin":
+                    if lazy:
+                        try:
+                            table = _TrackTable(p, root=folder)
+                            return dict(table.meta, tracks=_LazyItems(table), _format="bin", _journal=0, _root=folder)
+                        except ValueError:
+                            pass        # v1: eager decode below
+                    return self._finish_static_read(folder, _decode_static_bin(p.read_bytes()), "bin")
+                if fmt == "shards":
+                    return self._read_static_shards(folder, p, lazy)
+                data = json.loads(p.read_text(encoding="utf-8"))
+                if isinstance(data, dict) and isinstance(data.get("tracks"), list):
+                    return self._finish_static_read(folder, data, "json")
+            except Exception:
+                continue
         return None
 
-    def _write_static(self, folder: str, items: List[Dict], title: Optional[str] = None) -> None:
+    def _read_static_shards(self, folder: str, mpath: Path, lazy: bool) -> dict:
+        manifest = json.loads(mpath.read_text(encoding="utf-8"))
+        shards = manifest.pop("shards")
+        if lazy:
+            segs = [(_Shard(mpath.parent / sh["file"], int(sh["n"]), rel, sh.get("folder", ""), folder), None)
+                    for rel, sh in sorted(shards.items())]
+            items = _LazyItems(segs)
+            if manifest.get("order") and manifest.get("perm"):
+                try:
+                    perm = array(_U32)
+                    perm.frombytes((mpath.parent / manifest["perm"]).read_bytes())
+                    if sys.byteorder == "big":
+                        perm.byteswap()
+                    if len(perm) == len(items) and (not perm or max(perm) < len(perm)):
+                        items = _LazyItems(segs, order=manifest["order"], perm=perm)
+                except (OSError, ValueError):
+                    pass        # unsorted view; resort() sorts it from the columns
+            return dict(manifest, tracks=items, _format="shards", _journal=0, _root=folder)
+        tracks = []
+        for rel, sh in sorted(shards.items()):
+            tracks.extend(_decode_static_bin((mpath.parent / sh["file"]).read_bytes())["tracks"])
+        return self._finish_static_read(folder, dict(manifest, tracks=tracks), "shards")
+
+    def _finish_static_read(self, folder: str, data: dict, fmt: str) -> dict:
+        """Bring stored paths to root-relative form (rebasing legacy absolute
+        caches whose folder moved), then replay the journal on top."""
+        rel = _rebase_fn(folder, data)
+        if data.get("paths") != "relative":
+            for t in data["tracks"]:
+                t["path"] = rel(str(t.get("path", "")))
+            data["paths"] = "relative"
+        data["_format"], data["_root"] = fmt, folder
+        data["_journal"] = _replay_static_journal(data, self._static_journal_path_for(folder), rel)
+        return data
+
+    def _static_journal_path_for(self, folder: str) -> Path:
+        return Path(folder) / "static.journal"
+
+    def _static_head(self, folder: str, items, title: Optional[str] = None,
+                     dirs: Optional[dict] = None, scanned_at: Optional[float] = None) -> dict:
+        """Everything in the cache payload except "tracks" (resolved on the Tk thread)."""
+        if dirs is None and folder == self.current_folder:
+            dirs, scanned_at = self._dir_fingerprints, self._scanned_at
+        if folder == self.current_folder:
+            fid = self._folder_id
+        else:
+            fid = (self._read_static(folder) or {}).get("folder_id")
+        return {
+            "title": title or Path(folder).name,
+            "base_folder": str(Path(folder).resolve()),
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+            "scanned_at": scanned_at or 0.0,
+            "folder_id": fid or uuid.uuid4().hex[:12],
+            "order": self._items_order if items is self.items_all else None,
+            "paths": "relative",
+            "dirs": dirs or {},
+        }
+
+    def _commit_static(self, folder: str, payload: dict, seq: int, journal_upto: int = 0) -> bool:
+        """Write the cache file, then drop the journal entries it now contains:
+        the first `journal_upto` bytes, i.e. what existed when the payload was
+        snapshotted. Older snapshots never overwrite newer ones."""
+        spath = self._static_path_for(folder)
+        with _FileLock(spath.with_suffix(".lock"), timeout=6.0):
+            if seq < self._static_seq_written.get(folder, 0):
+                return False
+            if self.static_format == "bin":
+                _atomic_write_bytes(self._static_bin_path_for(folder), _encode_static_bin(payload))
+            elif self.static_format == "shards":
+                self._commit_static_shards(folder, payload)
+            else:
+                _atomic_write_json(spath, payload)
+            self._static_seq_written[folder] = seq
+        jp = self._static_journal_path_for(folder)
+        with self._journal_lock:
+            tail = b""
+            try:
+                with open(jp, "rb") as f:
+                    f.seek(journal_upto)
+                    tail = f.read()
+            except OSError:
+                pass
+            if tail:
+                _atomic_write_bytes(jp, tail)
+            else:
+                try: jp.unlink()
+                except OSError: pass
+        return True
+
+    def _commit_static_shards(self, folder: str, payload: dict) -> int:
+        """Sharded layout: one static.bin-format file per directory under
+        .prajna_static/ plus manifest.json. Shard files are named by directory
+        and content hash, so an unchanged directory is not rewritten and the
+        manifest (replaced last) never points at a half-written shard.
+        Returns how many shard files were written."""
+        mpath = self._static_manifest_path_for(folder)
+        sdir = mpath.parent
+        sdir.mkdir(exist_ok=True)
+        groups: Dict[str, List[dict]] = {}
+        at = []         # (directory, row in its shard) per playlist position
+        for t in payload["tracks"]:
+            p = t["path"]
+            rel = (os.path.dirname(p) if os.path.isabs(p) else p.rpartition("/")[0]) or "."
+            g = groups.setdefault(rel, [])
+            at.append((rel, len(g)))
+            g.append(t)
+        root_name = Path(folder).name
+        shards, written = {}, 0
+        for rel, tracks in groups.items():
+            blob = _encode_static_bin({"dir": rel, "paths": "relative", "tracks": tracks})
+            name = (hashlib.sha1(rel.encode("utf-8")).hexdigest()[:12] + "-"
+                    + hashlib.sha1(blob).hexdigest()[:12] + ".bin")
+            if not (sdir / name).exists():
+                _atomic_write_bytes(sdir / name, blob)
+                written += 1
+            shards[rel] = {"file": name, "n": len(tracks),
+                           "folder": root_name if rel == "." else os.path.basename(rel.replace("/", os.sep))}
+        manifest = {k: v for k, v in payload.items() if k != "tracks"}
+        manifest["order"] = None        # rows are grouped by directory, not in playlist order
+        if payload.get("order"):
+            # u32 playlist position -> row in shard storage order (shards sorted by
+            # directory, as _read_static_shards lays them out), so a sorted
+            # playlist reopens without reading any shard
+            base, n = {}, 0
+            for rel in sorted(groups):
+                base[rel], n = n, n + len(groups[rel])
+            perm = array(_U32, (base[rel] + j for rel, j in at))
+            if sys.byteorder == "big":
+                perm.byteswap()
+            blob = perm.tobytes()
+            name = "order-" + hashlib.sha1(blob).hexdigest()[:12] + ".u32"
+            if not (sdir / name).exists():
+                _atomic_write_bytes(sdir / name, blob)
+            manifest["order"], manifest["perm"] = payload["order"], name
+        manifest["shards"] = shards
+        _atomic_write_json(mpath, manifest)
+        live = {sh["file"] for sh in shards.values()} | {manifest.get("perm")}
+        for f in list(sdir.glob("*.bin")) + list(sdir.glob("*.u32")):
+            if f.name not in live:
+                try: f.unlink()
+                except OSError: pass
+        print(f"[Static] {written}/{len(shards)} shards written")
+        return written
+
+    def _write_static(self, folder: str, items: List[Dict], title: Optional[str] = None,
+                      dirs: Optional[dict] = None, scanned_at: Optional[float] = None) -> None:
+        """Queue a cache write on the background writer. Requests for the same
+        folder within STATIC_WRITE_DELAY collapse into one; the newest wins.
+        The payload is snapshotted here and built/encoded off the Tk thread."""
         if not self.allow_write_static.get():
             return
         try:
-            folder_p = Path(folder)
-            payload = {
-                "title": title or Path(folder).name,
-                "base_folder": str(folder_p.resolve()),
-                "created_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-                "tracks": []
-            }
-            for it in items:
-                payload["tracks"].append({
-                    "path": it["path"],
-                    "title": it["name"],
-                    "folder": it["folder"],
-                    "size": it.get("size", 0),
-                    "mtime": it.get("mtime", 0),
-                    "duration_ms": it.get("duration_ms"),
-                })
-            spath = self._static_path_for(folder)
-            lock = spath.with_suffix(".lock")
-            with _FileLock(lock, timeout=6.0):
-                _atomic_write_json(spath, payload)
+            head = self._static_head(folder, items, title, dirs, scanned_at)
         except Exception:
-            pass
+            return
+        try:
+            upto = self._static_journal_path_for(folder).stat().st_size
+        except OSError:
+            upto = 0
+        snap = items if isinstance(items, _LazyItems) else list(items)    # _LazyItems is never resized in place
+        self._static_seq += 1
+        seq = self._static_seq
+        if folder == self.current_folder:
+            self._folder_id = head["folder_id"]
+
+        def job():
+            prefix = _root_prefix(folder)
+            payload = dict(head, tracks=[_static_track(it, prefix) for it in snap])
+            if self._commit_static(folder, payload, seq, journal_upto=upto) and folder == self.current_folder:
+                self._folder_id_saved = True
+
+        self._writer.submit(("static", folder), job, delay=self.STATIC_WRITE_DELAY)
+
+    def _journal_static(self, folder: str, entries: List[dict]) -> None:
+        """Append incremental cache changes to static.journal instead of rewriting
+        the whole cache; folded back in by _compact_static_journal."""
+        if not entries or not folder or not self.allow_write_static.get():
+            return
+        if not self._static_exists(folder):
+            return      # nothing to replay onto; the next full write covers it
+        prefix = _root_prefix(folder)
+        for e in entries:
+            if "path" in e:
+                e["path"] = _rel_path(prefix, e["path"])
+            if "t" in e:
+                e["t"]["path"] = _rel_path(prefix, e["t"]["path"])
+        data = "".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n" for e in entries)
+        try:
+            with self._journal_lock:
+                with open(self._static_journal_path_for(folder), "ab") as f:
+                    f.write(data.encode("utf-8"))
+                    size = f.tell()
+        except OSError:
+            return
+        if size > _STATIC_JOURNAL_COMPACT_BYTES:
+            self._compact_static_journal(folder)
 
-    def _items_from_static(self, data: dict) -> List[Dict]:
+    def _compact_static_journal(self, folder: str) -> None:
+        """Fold the journal into the cache file (via the background writer)."""
+        if folder != self.current_folder or self._scan_cancel is not None:
+            return
+        self._write_static(folder, self.items_all)
+
+    def _items_from_static(self, data: dict, check_exists: bool = True) -> List[Dict]:
+        if isinstance(data.get("tracks"), _LazyItems):
+            return data["tracks"]
+        root = data.get("_root")
+        prefix = _root_prefix(root) if root and data.get("paths") == "relative" else None
         items = []
         try:
             for t in data.get("tracks", []):
-                p = Path(t.get("path",""))
-                if not p.exists():
+                p = Path(_abs_path(prefix, t.get("path", "")) if prefix else t.get("path", ""))
+                if check_exists and not p.exists():
                     continue
                 items.append({
                     "path": str(p),
@@ -1712,7 +3681,8 @@ class PrajnaPlayerApp:
                     "folder": p.parent.name,
                     "size": int(t.get("size", 0)),
                     "mtime": float(t.get("mtime", 0)),
-                    "duration_ms": t.get("duration_ms")
+                    "duration_ms": t.get("duration_ms"),
+                    "id": t.get("id"),
                 })
         except Exception:
             items = []
@@ -1722,12 +3692,39 @@ class PrajnaPlayerApp:
     def _recent_file(self) -> Path:
         return self.app_dir / "state_recent.json"
 
-    def _state_file_for(self, folder: str) -> Path:
+    def _legacy_state_file_for(self, folder: str) -> Path:
         abs_path = str(Path(folder).resolve())
         h = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:12]
         return self.app_dir / f"state_{h}.json"
 
+    def _folder_id_for(self, folder: str) -> Optional[str]:
+        if folder == self.current_folder:
+            return self._folder_id if self._folder_id_saved else None
+        data = self._read_static(folder)
+        return data.get("folder_id") if data else None
+
+    def _state_file_for(self, folder: str) -> Path:
+        """State file keyed by the static cache's folder_id (survives folder renames),
+        falling back to the hash of the resolved path."""
+        fid = self._folder_id_for(folder)
+        if fid:
+            return self.app_dir / f"state_id_{fid}.json"
+        return self._legacy_state_file_for(folder)
+
+    def _recent_folders(self, n: int = 10) -> List[dict]:
+        if self.state_db is not None:
+            try:
+                return self.state_db.recent(n)
+            except Exception:
+                return []
+        folder = self._load_recent()
+        return [{"folder": folder, "opened_at": 0.0, "song": None, "position": 0}] if folder else []
+
     def _load_recent(self) -> Optional[str]:
+        if self.state_db is not None:
+            for r in self._recent_folders(1):
+                return r["folder"] if Path(r["folder"]).exists() else None
+            return None
         try:
             f = self._recent_file()
             if f.exists():
@@ -1740,19 +3737,23 @@ class PrajnaPlayerApp:
         return None
 
     def _save_recent(self, folder: str):
-        try:
-            payload = {"folder": folder, "saved_at": time.time()}
-            _atomic_write_json(self._recent_file(), payload)
-        except Exception:
-            pass
+        payload = {"folder": folder, "saved_at": time.time()}
+        if self.state_db is not None:
+            job = lambda: self.state_db.touch_recent(folder, payload["saved_at"])
+        else:
+            job = lambda: _atomic_write_json(self._recent_file(), payload)
+        self._state_writer.submit("recent", job, delay=self.STATE_WRITE_DELAY)
 
     def _load_state_for_folder(self, folder: str) -> dict:
-        p = self._state_file_for(folder)
-        if not p.exists():
-            s = DEFAULT_STATE.copy(); s["folder"] = folder
-            return s
+        self._state_writer.flush(timeout=2.0)     # a queued save may be newer than the file
         try:
-            data = json.loads(p.read_text(encoding="utf-8"))
+            if self.state_db is not None:
+                data = self.state_db.get_state(folder, self._folder_id_for(folder))
+            else:
+                p = self._state_file_for(folder)
+                if not p.exists():
+                    p = self._legacy_state_file_for(folder)
+                data = json.loads(p.read_text(encoding="utf-8")) if p.exists() else None
             out = DEFAULT_STATE.copy()
             out.update(data or {})
             out["folder"] = folder
@@ -1761,52 +3762,156 @@ class PrajnaPlayerApp:
             s = DEFAULT_STATE.copy(); s["folder"] = folder
             return s
 
-    def _save_state_now(self):
-        if not self.current_folder:
+    def _save_state_now(self, position: Optional[int] = None):
+        """Snapshot the playback state and hand it to the write-behind state
+        writer; only the latest snapshot per folder is written, off the Tk thread.
+        `position` overrides the player time (a seek that has not happened yet)."""
+        # items_all still belongs to the previous folder while a scan is running
+        if not self.current_folder or self._scan_cancel is not None:
             return
         try:
             idx = self.current_index if self.current_index is not None else 0
+            if not (0 <= idx < len(self.items_all)):
+                return
             pos = int(self.player.get_time()) if (self.player and vlc) else 0
-            song = self.items_all[idx]["path"] if (0 <= idx < len(self.items_all)) else ""
+            if position is not None:
+                pos = int(position)
+            it = self.items_all[idx]
+            song = it["path"]
+            folder = self.current_folder
             payload = {
-                "folder": self.current_folder,
+                "folder": folder,
                 "index": int(idx),
                 "volume": int(self.volume.get()),
                 "song": song,
+                "song_id": it.get("id"),
+                "song_hash": None,
+                "song_size": int(it.get("size", 0)),
                 "position": int(max(0, pos)),
                 "saved_at": time.time(),
             }
-            _atomic_write_json(self._state_file_for(self.current_folder), payload)
-            self._save_recent(self.current_folder)
-            self._last_state_save = time.time()
         except Exception:
-            pass
+            return
+
+        def job():
+            if self._song_hash[0] != song:      # hashed here: it reads 128 KB of the track
+                self._song_hash = (song, _content_hash(song, payload["song_size"] or None))
+            payload["song_hash"] = self._song_hash[1]
+            if self.state_db is not None:
+                self.state_db.put_state(folder, self._folder_id_for(folder), payload)
+            else:
+                _atomic_write_json(self._state_file_for(folder), payload)
+
+        self._state_writer.submit(("state", folder), job, delay=self.STATE_WRITE_DELAY)
+        self._save_recent(folder)
+        track_pos = position if position is not None else self._player_track_pos()
+        if track_pos is not None and self._playing_item is not None:
+            self._remember_track_pos(self._playing_item, track_pos)
+        self._last_state_save = time.time()
+
+    # --- Per-track resume positions ---
+    def _track_key(self, it: Dict) -> str:
+        return it.get("id") or "p:" + it["path"]
+
+    def _player_track_pos(self) -> Optional[int]:
+        """Position of the loaded track worth remembering: None when nothing is
+        playing or paused, 0 once it has ended."""
+        if not self.player or not vlc:
+            return None
+        try:
+            state = self.player.get_state()
+            if state == vlc.State.Ended:
+                return 0
+            if state not in (vlc.State.Playing, vlc.State.Paused):
+                return None
+            pos, length = int(self.player.get_time()), int(self.player.get_length())
+        except Exception:
+            return None
+        return 0 if length > 0 and pos > length - self.TRACK_POS_MIN_MS else max(0, pos)
+
+    def _remember_track_pos(self, it: Dict, pos: int):
+        """Record the position of one track (LRU, capped at track_history_max rows)."""
+        if self.state_db is None or self.track_history_max <= 0:
+            return
+        dur = int(it.get("duration_ms") or 0)
+        if pos < self.TRACK_POS_MIN_MS or (dur and pos > dur - self.TRACK_POS_MIN_MS):
+            pos = 0         # barely started or finished: start over next time
+        key, path, t, cap = self._track_key(it), it["path"], time.time(), self.track_history_max
+        self._track_pos_hot[key] = pos
+        self._track_pos_hot.move_to_end(key)
+        if len(self._track_pos_hot) > self.TRACK_POS_HOT:
+            self._track_pos_hot.popitem(last=False)
+        self._state_writer.submit(("track", key), lambda: self.state_db.put_track_pos(key, path, pos, t, cap),
+                                  delay=self.STATE_WRITE_DELAY)
+
+    def _track_resume_ms(self, it: Dict) -> int:
+        if self.state_db is None or self.track_history_max <= 0:
+            return 0
+        key = self._track_key(it)
+        pos = self._track_pos_hot.get(key)
+        if pos is None:
+            try:
+                pos = self.state_db.get_track_pos(key)
+            except Exception:
+                pos = None
+        return int(pos or 0)
 
     # --- Data / View ---
     def open_folder(self):
         folder = filedialog.askdirectory(title="Select folder with audio/talks")
         if not folder: return
+        self._open_folder_path(folder)
+
+    def _set_current_folder(self, folder: Optional[str]):
+        """Switch current_folder; the folder_id belongs to the old folder until
+        _finish_scan sets the new one, so state saves must not use it."""
+        if folder != self.current_folder:
+            self._folder_id, self._folder_id_saved = None, False
         self.current_folder = folder
+
+    def _open_folder_path(self, folder: str):
+        self._set_current_folder(folder)
         self._update_title()
         self._save_recent(folder)
-        self.scan_folder(folder)
+        self.scan_folder(folder, on_done=lambda: self._after_open_scan(folder))
+
+    def _after_open_scan(self, folder: str):
         self.sort_mode.set(SORT_CHOICES[0])   # ensure A→Z
         self.resort(); self.apply_filter()
         st = self._load_state_for_folder(folder)
-        if st.get("song") and Path(st["song"]).exists():
-            idx = self._index_of_path(st["song"])
-            if idx is not None:
-                self.volume.set(int(st.get("volume", 70)))
-                self._play_index(idx, resume_ms=int(st.get("position", 0)))
+        idx = self._resume_index_for(st)
+        if idx is not None:
+            self.volume.set(int(st.get("volume", 70)))
+            self._play_index(idx, resume_ms=int(st.get("position", 0)))
+
+    def _show_recent_menu(self, anchor: tk.Widget):
+        menu = tk.Menu(self.root, tearoff=0)
+        for r in self._recent_folders(10):
+            label = Path(r["folder"]).name or r["folder"]
+            if r.get("song"):
+                label += f"  —  {Path(r['song']).stem}  @ {self._format_dur(r['position'])}"
+            state = "normal" if Path(r["folder"]).exists() else "disabled"
+            menu.add_command(label=label, state=state, command=lambda f=r["folder"]: self._open_folder_path(f))
+        if menu.index("end") is None:
+            menu.add_command(label="(no recent folders)", state="disabled")
+        try:
+            menu.tk_popup(anchor.winfo_rootx(), anchor.winfo_rooty() + anchor.winfo_height())
+        finally:
+            menu.grab_release()
 
     def open_static_file(self):
         base = Path(self.current_folder or Path.cwd())
         f = filedialog.askopenfilename(title="Open static.json", initialdir=str(base),
-                                       filetypes=(("JSON", "*.json"), ("All files", "*.*")))
+                                       filetypes=(("JSON", "*.json"), ("Static cache", "*.bin"), ("All files", "*.*")))
         if not f: return
         try:
-            with open(f, "r", encoding="utf-8") as fh:
-                data = json.load(fh)
+            if f.lower().endswith(".bin"):
+                data = _decode_static_bin(Path(f).read_bytes())
+            else:
+                with open(f, "r", encoding="utf-8") as fh:
+                    data = json.load(fh)
+            if isinstance(data, dict):
+                data.setdefault("_root", str(Path(f).parent))
         except Exception as e:
             messagebox.showerror("Invalid JSON", f"Cannot parse:\n{e}"); return
 
@@ -1826,8 +3931,8 @@ class PrajnaPlayerApp:
         else:
             messagebox.showwarning("Unsupported", "Unsupported JSON format"); return
 
-        self.items_all = items
-        self.current_folder = str(Path(items[0]["path"]).parent) if items else self.current_folder
+        self.items_all, self._items_order = items, None
+        self._set_current_folder(str(Path(items[0]["path"]).parent) if items else self.current_folder)
         self._update_title()
         if self.current_folder:
             self._build_sub_index(Path(self.current_folder))
@@ -1835,33 +3940,270 @@ class PrajnaPlayerApp:
 
     def rescan_current_folder(self):
         if not self.current_folder: return
-        self.scan_folder(self.current_folder)
+        self.scan_folder(self.current_folder, rescan=True, on_done=self._after_rescan)
+
+    def _after_rescan(self):
         self.sort_mode.set(SORT_CHOICES[0])   # ensure A→Z
         self.resort(); self.apply_filter()
 
-    def scan_folder(self, folder: str):
-        root = Path(folder)
+    def scan_folder(self, folder: str, rescan: bool = False, on_done=None):
+        """Load `folder` into items_all on a background thread.
 
-        # Try static cache
-        data = self._read_static(folder)
-        items = []
-        if data:
-            items = self._items_from_static(data)
+        The walk + static diff run in _scan_job; progress and the result come back
+        through self.q and _finish_scan applies them on the Tk thread, then calls
+        `on_done()`. A newer scan (or Cancel) abandons the running one.
+        """
+        self._cancel_scan()
+        self._cancel_probe()        # a previous folder's duration probe would keep the progress bar up
+        self._stop_watcher()
+        self._scan_gen += 1
+        gen = self._scan_gen
+        cancel = threading.Event()
+        self._scan_cancel = cancel
+        self._scan_on_done = on_done
+        self._scan_rescan = rescan
+        # items_all is replaced, never resized in place, so the worker can read it as is
+        cached = self.items_all if (rescan and folder == self.current_folder and len(self.items_all)) else None
+        self._scan_progress = {"t0": time.perf_counter(), "seen": 0, "probed": 0, "probe_total": 0, "phase": "walk"}
+        self._show_scan_progress(True)
+
+        def job():
+            try:
+                res = self._scan_job(folder, rescan, cached, cancel,
+                                     lambda n: self.q.put(("scan_progress", (gen, n))))
+            except Exception as e:
+                res = {"error": str(e)}
+            self.q.put(("scan_done", (gen, folder, res)))
+
+        threading.Thread(target=job, daemon=True).start()
+
+    def _scan_job(self, folder: str, rescan: bool, cached: Optional[List[Dict]],
+                  cancel: threading.Event, progress) -> Optional[dict]:
+        """Worker-thread half of scan_folder (no Tk calls).
 
-        # Fallback to filesystem scan
-        if not items:
-            files = []
-            for ext in (*AUDIO_EXTS, *VIDEO_EXTS):
-                files.extend(root.rglob(f"*{ext}"))
-            items = [self._make_item_from_path(p) for p in files]
-            self._write_static(folder, items, title=root.name)
+        static.json carries per-directory fingerprints (mtime, entry count, subtitle
+        names); on open each directory costs one stat and only the ones that
+        changed are listed again. Tracks in fresh directories are reused as-is;
+        the rest are diffed by (path, size, mtime) so only new or modified files
+        are probed. `rescan` (F5) ignores the fingerprints and lists everything.
+        """
+        root = Path(folder)
+        stats = {"files": 0, "subs": 0, "images": 0, "source": "static"}
+
+        t0 = time.perf_counter()
+        data = self._read_static(folder, lazy=True)
+        stats["static"] = time.perf_counter() - t0
+        if data and data.get("_journal"):
+            stats["journal"] = data["_journal"]
+        known = data.get("dirs") if (data and not rescan) else None
+        prev_scanned_at = float(data.get("scanned_at") or 0.0) if data else 0.0
+
+        # One walk feeds both the playlist and the sub-index
+        scanned_at = time.time()
+        walk = _walk_library(root, known_dirs=known if isinstance(known, dict) else None,
+                             scanned_at=prev_scanned_at, cancel=cancel, progress=progress)
+        stats.update(walk["timings"])
+        if walk["cancelled"]:
+            return None
 
-        self.items_all = items
-        self._build_sub_index(root)
+        if cached is None:
+            cached = self._items_from_static(data, check_exists=False) if data else []
+
+        # Tracks under unchanged directories are trusted; everything else is diffed
+        fresh = walk["fresh"]
+        if isinstance(cached, _LazyItems):
+            keep, rest = cached.split_dirs(folder, fresh)
+        else:
+            keep, rest = [], []
+            for it in cached:
+                rel = os.path.relpath(os.path.dirname(it["path"]), folder).replace(os.sep, "/")
+                (keep if rel in fresh else rest).append(it)
+        items, todo, counts = self._incremental_items(walk["media"], rest)
+        items = keep + items if items else keep
+        counts["unchanged"] += len(keep)
+        stats.update(counts)
+        stale = len(walk["dirs"]) - len(fresh)
+        stats["stale_dirs"] = stale
+        if rescan:
+            stats["source"] = "rescan"
+        elif not data:
+            stats["source"] = "scan"
+        elif stale:
+            stats["source"] = f"static, {stale}/{len(walk['dirs'])} dirs re-listed"
+
+        changed = bool(todo or counts["added"] or counts["removed"] or counts["changed"] or counts["moved"])
+        # Refresh fingerprints when a subfolder changed (the root's mtime moves on
+        # every static write, so it alone does not justify another write).
+        stored = data.get("dirs") if data else None
+        refresh = not isinstance(stored, dict) or set(stored) != set(walk["dirs"]) or any(
+            rel != "." and (stored.get(rel) or {}).get("mtime") != fp["mtime"]
+            for rel, fp in walk["dirs"].items())
+        t0 = time.perf_counter()
+        sub_index = _sub_index_from_paths(walk["subs"])
+        stats["index"] = time.perf_counter() - t0
+        stats.update(files=len(items), subs=len(walk["subs"]), images=len(walk["images"]))
+        return {"items": items, "todo": todo, "write": changed or refresh, "sub_index": sub_index,
+                "folder_id": (data or {}).get("folder_id"),
+                "migrate": bool(data) and data.get("_format") != self.static_format,
+                "dirs": walk["dirs"], "scanned_at": scanned_at, "stats": stats}
+
+    def _finish_scan(self, folder: str, res: Optional[dict]):
+        """Tk-thread half of scan_folder: install the scan result."""
+        self._scan_cancel = None
+        on_done, self._scan_on_done = self._scan_on_done, None
+        if not res or "error" in res:
+            self._show_scan_progress(False)
+            msg = f"Scan failed: {res['error']}" if res else "Scan cancelled"
+            try: self.scan_status_var.set(msg)
+            except Exception: pass
+            return
+        self.items_all = res["items"]
+        self._items_order = getattr(self.items_all, "order", None)
+        self._folder_id = res["folder_id"]
+        self._folder_id_saved = bool(res["folder_id"])
+        self._dir_fingerprints = res["dirs"]
+        self._scanned_at = res["scanned_at"]
+        self.sub_index = res["sub_index"]
+        self._rebuild_path_index()
+        self._report_scan_stats(res["stats"])
         self._refresh_folder_filter_visibility()
+        if res["write"]:
+            self._start_probe(folder, res["todo"])
+        elif res["migrate"]:
+            self._write_static(folder, self.items_all)
+        elif res["stats"].get("journal"):
+            try: big = self._static_journal_path_for(folder).stat().st_size > _STATIC_JOURNAL_COMPACT_BYTES
+            except OSError: big = False
+            if big:
+                self._compact_static_journal(folder)
+        if not self._probe_cancel:
+            self._show_scan_progress(False)
+        self._start_watcher()
+        if on_done:
+            on_done()
+
+    def cancel_scan(self):
+        """Cancel button: stop the running walk and/or duration probe."""
+        running = self._scan_cancel is not None or self._probe_cancel is not None
+        if self._scan_cancel is not None and not self._scan_rescan:
+            # items_all still belongs to the previously opened folder
+            self.items_all, self.current_index, self._items_order = [], -1, None
+            self._rebuild_path_index(); self.apply_filter()
+        self._cancel_scan()
+        self._cancel_probe()
+        self._show_scan_progress(False)
+        if running:
+            try: self.scan_status_var.set("Scan cancelled")
+            except Exception: pass
+
+    def _cancel_scan(self):
+        ev = getattr(self, "_scan_cancel", None)
+        if ev is not None:
+            ev.set()
+        self._scan_cancel = None
+        self._scan_on_done = None
+
+    def _show_scan_progress(self, active: bool):
+        bar = getattr(self, "scan_progress_frame", None)
+        if bar is None:
+            return
+        try:
+            if active:
+                bar.grid()
+                self.scan_progressbar.configure(mode="indeterminate")
+                self.scan_progressbar.start(80)
+            else:
+                self.scan_progressbar.stop()
+                bar.grid_remove()
+        except Exception:
+            pass
+
+    def _update_scan_progress(self):
+        sp = self._scan_progress
+        elapsed = time.perf_counter() - sp["t0"]
+        if sp["phase"] == "walk":
+            txt = f"Scanning… {sp['seen']} files seen · {elapsed:.1f}s"
+        else:
+            txt = f"Probing… {sp['probed']}/{sp['probe_total']} files · {elapsed:.1f}s"
+            try:
+                self.scan_progressbar.stop()
+                self.scan_progressbar.configure(mode="determinate", maximum=max(1, sp["probe_total"]),
+                                                value=sp["probed"])
+            except Exception:
+                pass
+        try:
+            self.scan_status_var.set(txt)
+        except Exception:
+            pass
+
+    def _incremental_items(self, media, cached: List[Dict]) -> Tuple[List[Dict], List[Dict], Dict[str, int]]:
+        """Diff walked (path, size, mtime, inode) entries against cached items.
+
+        Returns (items, to_probe, counts) where to_probe holds only new or
+        modified files and counts has added/removed/changed/moved/unchanged.
+        A new path whose identity matches a vanished cached track is a move:
+        it keeps the cached duration instead of being probed.
+        """
+        by_path = {str(Path(it["path"])): it for it in cached}
+        items: List[Dict] = []
+        todo: List[Dict] = []
+        counts = {"added": 0, "removed": 0, "changed": 0, "moved": 0, "unchanged": 0}
+        seen = set()
+        fresh: List[Dict] = []
+        for p, size, mtime, ino in media:
+            key = str(Path(p))
+            seen.add(key)
+            prev = by_path.get(key)
+            if prev is not None and int(prev.get("size", 0)) == size and abs(float(prev.get("mtime", 0)) - mtime) < 1e-3:
+                if ino and not prev.get("id"):
+                    prev["id"] = _file_identity(ino, size)
+                items.append(prev)
+                counts["unchanged"] += 1
+                continue
+            it = self._make_item_from_path(Path(p), size=size, mtime=mtime, probe=False)
+            it["id"] = _file_identity(ino, size)
+            items.append(it)
+            if prev is not None:
+                todo.append(it)
+                counts["changed"] += 1
+            else:
+                fresh.append(it)
+        gone = {it["id"]: it for k, it in by_path.items() if k not in seen and it.get("id")}
+        for it in fresh:
+            old = gone.pop(it["id"], None) if it["id"] else None
+            if old is not None:
+                it["duration_ms"] = old.get("duration_ms")
+                counts["moved"] += 1
+                if it["duration_ms"] is None:
+                    todo.append(it)
+            else:
+                todo.append(it)
+                counts["added"] += 1
+        counts["removed"] = sum(1 for k in by_path if k not in seen) - counts["moved"]
+        return items, todo, counts
+
+    def _report_scan_stats(self, stats: dict):
+        """Show per-phase scan timings in the Library panel (and on stdout)."""
+        self.scan_stats = stats
+        phases = [f"{k} {stats[k]:.2f}s" for k in ("walk", "static", "index", "probe") if k in stats]
+        txt = f"{stats.get('files', 0)} files ({stats.get('source', '')}) · " + " · ".join(phases)
+        if "added" in stats:
+            txt += f" · +{stats['added']} −{stats['removed']} ~{stats['changed']}"
+            if stats.get("moved"):
+                txt += f" ↷{stats['moved']}"
+        if stats.get("journal"):
+            txt += f" · journal {stats['journal']}"
+        print(f"[Scan] {txt} · subs {stats.get('subs', 0)} · images {stats.get('images', 0)}")
+        try:
+            self.scan_status_var.set(txt)
+        except Exception:
+            pass
 
     def _refresh_folder_filter_visibility(self):
-        folders = sorted({it["folder"] for it in self.items_all})
+        if isinstance(self.items_all, _LazyItems):
+            folders = sorted(self.items_all.folders())
+        else:
+            folders = sorted({it["folder"] for it in self.items_all})
         if len(folders) > 1:
             values = ["(All)"] + folders
             self.folder_combo.configure(values=values)
@@ -1884,70 +4226,388 @@ class PrajnaPlayerApp:
         s = int(ms/1000); m, s = divmod(s, 60); h, m = divmod(m, 60)
         return f"{h:02d}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
 
-    def _make_item_from_path(self, p: Path) -> Dict:
-        try:
-            st = p.stat(); mtime = st.st_mtime; size = st.st_size
-        except Exception:
-            mtime = 0; size = 0
-        dur = None
-        if MutagenFile is not None and p.suffix.lower() in AUDIO_EXTS:
+    def _make_item_from_path(self, p: Path, size: Optional[int] = None, mtime: Optional[float] = None,
+                             probe: bool = True) -> Dict:
+        if size is None or mtime is None:
             try:
-                mf = MutagenFile(str(p))
-                if mf and mf.info and getattr(mf.info, 'length', None):
-                    dur = int(float(mf.info.length) * 1000)
+                st = p.stat(); mtime = st.st_mtime; size = st.st_size
             except Exception:
-                dur = None
+                mtime = 0; size = 0
+        dur = None
+        if probe:
+            dur, row = _cached_probe(self.meta_store, str(p))
+            if row is not None:
+                self._store_rows(self.meta_store, [row])
         return {"path": str(p), "name": p.stem, "folder": str(p.parent.name),
                 "size": size, "mtime": mtime, "duration_ms": dur}
 
+    def _rebuild_path_index(self):
+        """Drop the path/id indexes; _index_maps rebuilds them on first use."""
+        self._path_index = self._id_index = None
+
+    def _index_maps(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        if self._path_index is None:
+            self._path_index, self._id_index = {}, {}
+            for i, it in enumerate(self.items_all):
+                self._path_index[str(Path(it["path"]))] = i
+                if it.get("id"):
+                    self._id_index[it["id"]] = i
+        return self._path_index, self._id_index
+
+    def _resume_index_for(self, st: dict) -> Optional[int]:
+        """Find the state's track: by path, then identity (inode+size), then content hash."""
+        song = st.get("song")
+        if song and Path(song).exists():
+            idx = self._index_of_path(song)
+            if idx is not None:
+                return idx
+        sid = st.get("song_id")
+        if sid and sid in self._index_maps()[1]:
+            return self._id_index[sid]
+        shash, ssize = st.get("song_hash"), st.get("song_size")
+        if shash and ssize:
+            for i, it in enumerate(self.items_all):
+                if int(it.get("size", 0)) == int(ssize) and _content_hash(it["path"], int(ssize)) == shash:
+                    return i
+        return None
+
     def _index_of_path(self, path: str) -> Optional[int]:
+        if self._path_index is None and isinstance(self.items_all, _LazyItems):
+            return self.items_all.find(path)    # one lookup does not justify indexing every row
+        idx = self._index_maps()[0].get(str(Path(path)))
+        if idx is not None and idx < len(self.items_all) and Path(self.items_all[idx]["path"]) == Path(path):
+            return idx
         for i, it in enumerate(self.items_all):
             if Path(it["path"]) == Path(path):
                 return i
         return None
 
+    # --- Background duration probing ---
+    def _start_probe(self, folder: str, items: List[Dict], replace: bool = True):
+        """Probe durations for `items` on a bounded thread pool.
+
+        Results are streamed back through self.q in chunks and applied by
+        _drain_q on the Tk thread, so the playlist is usable immediately.
+        `replace=False` runs alongside a probe that is already in flight
+        (watcher updates) instead of cancelling it.
+        """
+        if replace:
+            self._cancel_probe()
+        todo = [it for it in items if Path(it["path"]).suffix.lower() in AUDIO_EXTS]
+        journal = None if replace else todo     # watcher probes append to static.journal
+        if not todo:
+            self.q.put(("probe_done", (self._scan_gen, folder, 0.0, journal)))
+            return
+        sp = self._scan_progress
+        if replace or sp["phase"] != "probe":
+            sp.update(t0=time.perf_counter(), probed=0, probe_total=0)
+        sp["phase"] = "probe"
+        sp["probe_total"] += len(todo)
+        gen = self._scan_gen
+        cancel = self._probe_cancel if (not replace and self._probe_cancel) else threading.Event()
+        self._probe_cancel = cancel
+        workers = max(1, int(self.probe_workers))
+        store = self.meta_store
+
+        def worker():
+            t0 = time.perf_counter()
+            batch, last_put = [], time.perf_counter()
+            new_rows = []
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prajna-probe")
+            try:
+                futs = {pool.submit(_cached_probe, store, it["path"]): it for it in todo}
+                for fut in as_completed(futs):
+                    if cancel.is_set():
+                        break
+                    try:
+                        dur, row = fut.result()
+                    except Exception:
+                        dur, row = None, None
+                    batch.append((futs[fut], dur))
+                    if row is not None:
+                        new_rows.append(row)
+                    now = time.perf_counter()
+                    if batch and (len(batch) >= 128 or now - last_put >= 0.25):
+                        self.q.put(("durations", (gen, batch)))
+                        batch, last_put = [], now
+                        self._store_rows(store, new_rows); new_rows = []
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+            if batch:
+                self.q.put(("durations", (gen, batch)))
+            self._store_rows(store, new_rows)
+            if not cancel.is_set():
+                self.q.put(("probe_done", (gen, folder, time.perf_counter() - t0, journal)))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    @staticmethod
+    def _store_rows(store: Optional[_MetaStore], rows):
+        if store is not None and rows:
+            try: store.put_many(rows)
+            except Exception: pass
+
+    def _cancel_probe(self):
+        ev = getattr(self, "_probe_cancel", None)
+        if ev is not None:
+            ev.set()
+        self._probe_cancel = None
+
+    # --- Folder watcher (polling) ---
+    def _toggle_watch(self):
+        if self.watch_enabled.get():
+            self._start_watcher()
+        else:
+            self._stop_watcher()
+
+    def _start_watcher(self):
+        """Poll the open folder for new/removed/renamed media and subtitles.
+
+        Each poll re-uses the static-cache directory fingerprints, so an idle
+        library costs one stat per directory; only directories whose mtime moved
+        are listed. Changes are posted to self.q and applied by _apply_watch_update.
+        """
+        self._stop_watcher()
+        if not (self.watch_enabled.get() and self.current_folder):
+            return
+        folder = self.current_folder
+        gen = self._scan_gen
+        interval = max(0.5, self.watch_interval_ms / 1000.0)
+        stop = threading.Event()
+        self._watch_stop = stop
+        known_dirs = dict(self._dir_fingerprints)
+        items = self.items_all      # replaced, never resized in place: safe to read off the Tk thread
+        scanned_at = self._scanned_at
+
+        def watcher():
+            nonlocal known_dirs, scanned_at
+            known_media = {str(Path(it["path"])): (int(it.get("size", 0)), float(it.get("mtime", 0)))
+                           for it in items}
+            while not stop.wait(interval):
+                t = time.time()
+                try:
+                    walk = _walk_library(Path(folder), known_dirs=known_dirs, scanned_at=scanned_at)
+                except Exception:
+                    continue
+                relisted = {rel for rel in walk["dirs"] if rel not in walk["fresh"]}
+                gone = set(known_dirs) - set(walk["dirs"])
+                touched = relisted | gone
+                scanned_at = t
+                if not touched:
+                    continue
+                seen = {}
+                for p, size, mtime, ino in walk["media"]:
+                    seen[str(Path(p))] = (size, mtime, ino)
+                added, changed, removed = [], [], []
+                for key, (size, mtime, ino) in seen.items():
+                    prev = known_media.get(key)
+                    if prev is None:
+                        added.append((key, size, mtime, ino))
+                    elif prev[0] != size or abs(prev[1] - mtime) >= 1e-3:
+                        changed.append((key, size, mtime, ino))
+                for key in known_media:
+                    if key in seen:
+                        continue
+                    rel = os.path.relpath(os.path.dirname(key), folder).replace(os.sep, "/")
+                    if rel in touched:
+                        removed.append(key)
+                subs_changed = gone or any(
+                    walk["dirs"][rel].get("subs") != (known_dirs.get(rel) or {}).get("subs") for rel in relisted)
+                known_dirs = walk["dirs"]
+                for key in removed:
+                    known_media.pop(key, None)
+                for key, size, mtime, _ in added + changed:
+                    known_media[key] = (size, mtime)
+                if added or changed or removed or subs_changed:
+                    self.q.put(("watch", (gen, folder, added, changed, removed,
+                                          walk["subs"] if subs_changed else None, walk["dirs"], t)))
+
+        self._watch_thread = threading.Thread(target=watcher, daemon=True)
+        self._watch_thread.start()
+
+    def _stop_watcher(self):
+        ev = getattr(self, "_watch_stop", None)
+        if ev is not None:
+            ev.set()
+        self._watch_stop = None
+
+    def _apply_watch_update(self, folder, added, changed, removed, subs, dirs, scanned_at):
+        """Merge watcher changes into items_all / items_view / sub_index in place,
+        keeping the current track and the playlist selection."""
+        cur_path = self.items_all[self.current_index]["path"] if 0 <= self.current_index < len(self.items_all) else None
+        selected = []
+        try:
+            selected = [self.items_all[int(iid)]["path"] for iid in self.tv.selection()]
+        except Exception:
+            pass
+
+        gone = set(removed)
+        items = [it for it in self.items_all if str(Path(it["path"])) not in gone]
+        moved_from = {it["id"]: it for it in self.items_all
+                      if it.get("id") and str(Path(it["path"])) in gone}
+        by_path = {str(Path(it["path"])): it for it in items}
+        todo, fresh = [], []
+        for p, size, mtime, ino in changed:
+            it = by_path.get(p)
+            if it is not None:
+                it.update(size=size, mtime=mtime, duration_ms=None, id=_file_identity(ino, size))
+                todo.append(it)
+        for p, size, mtime, ino in added:
+            if p in by_path:
+                continue
+            it = self._make_item_from_path(Path(p), size=size, mtime=mtime, probe=False)
+            it["id"] = _file_identity(ino, size)
+            old = moved_from.pop(it["id"], None) if it["id"] else None
+            if old is not None and old.get("duration_ms") is not None:
+                it["duration_ms"] = old["duration_ms"]      # renamed/moved: no re-probe
+                if cur_path and Path(old["path"]) == Path(cur_path):
+                    cur_path = it["path"]
+            else:
+                todo.append(it)
+            items.append(it)
+            fresh.append(it)
+        entries = [{"op": "del", "path": it["path"]} for it in self.items_all if str(Path(it["path"])) in gone]
+        entries += [{"op": "add", "t": _static_track(it)} for it in fresh]
+        entries += [{"op": "add", "t": _static_track(by_path[p])} for p, *_ in changed if p in by_path]
+        self.items_all, self._items_order = items, None
+        self._dir_fingerprints, self._scanned_at = dirs, scanned_at
+        self._journal_static(folder, entries)
+        if subs is not None:
+            self._build_sub_index(Path(folder), subs=subs)
+        self.resort()   # rebuilds path index + view
+
+        self.current_index = self._index_of_path(cur_path) if cur_path else -1
+        if self.current_index is None:
+            self.current_index = -1
+        keep_sel = [str(i) for i in (self._index_of_path(p) for p in selected) if i is not None]
+        try:
+            if keep_sel:
+                self.tv.selection_set(keep_sel)
+        except Exception:
+            pass
+        self._refresh_folder_filter_visibility()
+        self._start_probe(folder, todo, replace=False)
+        print(f"[Watch] +{len(added)} −{len(removed)} ~{len(changed)}" + (" · subs" if subs is not None else ""))
+
+    def _apply_durations(self, batch):
+        self._scan_progress["probed"] += len(batch)
+        self._update_scan_progress()
+        for it, dur in batch:
+            if dur is None:
+                continue
+            it["duration_ms"] = dur
+            if self._path_index is None and isinstance(self.items_all, _LazyItems):
+                idx = self.items_all.index_of_extra(it)     # probed tracks are never table rows
+            else:
+                idx = self._index_maps()[0].get(str(Path(it["path"])))
+            if idx is None:
+                continue
+            try:
+                if self.tv.exists(str(idx)):
+                    self.tv.set(str(idx), "dur", self._format_dur(dur))
+            except Exception:
+                pass
+
+    def _drain_q(self):
+        try:
+            while True:
+                kind, payload = self.q.get_nowait()
+                if kind == "durations":
+                    gen, batch = payload
+                    if gen == self._scan_gen:
+                        self._apply_durations(batch)
+                elif kind == "watch":
+                    gen, folder, *rest = payload
+                    if gen == self._scan_gen and folder == self.current_folder:
+                        self._apply_watch_update(folder, *rest)
+                elif kind == "scan_progress":
+                    gen, seen = payload
+                    if gen == self._scan_gen and self._scan_cancel is not None:
+                        self._scan_progress["seen"] = seen
+                        self._update_scan_progress()
+                elif kind == "scan_done":
+                    gen, folder, res = payload
+                    if gen == self._scan_gen and self._scan_cancel is not None:
+                        self._finish_scan(folder, res)
+                elif kind == "probe_done":
+                    gen, folder, elapsed, journal = payload
+                    if gen == self._scan_gen and self._scan_cancel is None:
+                        self._probe_cancel = None
+                        self._show_scan_progress(False)
+                    if gen == self._scan_gen and folder == self.current_folder:
+                        if journal is None:
+                            self._write_static(folder, self.items_all, title=Path(folder).name)
+                        else:
+                            self._journal_static(folder, [_journal_dur(it) for it in journal
+                                                          if it.get("duration_ms") is not None])
+                        if elapsed and self.scan_stats:
+                            self.scan_stats["probe"] = elapsed
+                            self.scan_stats["files"] = len(self.items_all)
+                            self._report_scan_stats(self.scan_stats)
+        except queue.Empty:
+            pass
+        self.root.after(100, self._drain_q)
+
     def resort(self):
         key = self.sort_mode.get()
-        items = self.items_all[:]
-        if key == "Title (A→Z)":
-            items.sort(key=lambda x: x["name"].lower())
-        elif key == "Title (Z→A)":
-            items.sort(key=lambda x: x["name"].lower(), reverse=True)
-        elif key == "Modified (Newest)":
-            items.sort(key=lambda x: x["mtime"], reverse=True)
-        elif key == "Modified (Oldest)":
-            items.sort(key=lambda x: x["mtime"])
-        elif key == "Size (Large→Small)":
-            items.sort(key=lambda x: x["size"], reverse=True)
-        elif key == "Size (Small→Large)":
-            items.sort(key=lambda x: x["size"])
-        elif key == "Duration (Long→Short)":
-            items.sort(key=lambda x: (x["duration_ms"] if x["duration_ms"] else -1), reverse=True)
-        elif key == "Duration (Short→Long)":
-            items.sort(key=lambda x: (x["duration_ms"] if x["duration_ms"] else 10**12))
-        self.items_all = items; self.apply_filter()
+        if key == self._items_order:
+            # already in this order (e.g. a lazy table written after the same sort)
+            self._rebuild_path_index(); self.apply_filter()
+            return
+        spec = SORT_SPECS.get(key)
+        if isinstance(self.items_all, _LazyItems):
+            items = self.items_all.sorted_by(*spec) if spec else self.items_all    # keys read from the columns
+            if spec:
+                items.order = key
+        else:
+            items = self.items_all[:]
+            if spec:
+                field, rev = spec
+                items.sort(key=lambda x: _sort_value(field, x[field], rev), reverse=rev)
+        self.items_all, self._items_order = items, key
+        self._rebuild_path_index(); self.apply_filter()
 
     def apply_filter(self):
         q = (self.search_var.get() or "").strip().lower()
         folder = self.folder_filter.get()
-        view_idx = []
-        for i, it in enumerate(self.items_all):
-            if folder and folder != "(All)" and it["folder"] != folder: continue
-            if q and q not in it["name"].lower(): continue
-            view_idx.append(i)
+        if not q and (not folder or folder == "(All)"):
+            view_idx = list(range(len(self.items_all)))     # no row needs to be looked at
+        elif not q and isinstance(self.items_all, _LazyItems):
+            view_idx = self.items_all.indices_in_folder(folder)     # opens only that folder's shards
+        else:
+            view_idx = []
+            for i, it in enumerate(self.items_all):
+                if folder and folder != "(All)" and it["folder"] != folder: continue
+                if q and q not in it["name"].lower(): continue
+                view_idx.append(i)
         self.items_view = view_idx
         self._refresh_tree()
 
     def _refresh_tree(self):
         self.tv.delete(*self.tv.get_children())
-        for n, idx in enumerate(self.items_view, start=1):
+        self._tree_filled = 0
+        self._fill_tree_more()
+
+    def _fill_tree_more(self):
+        """Insert the next TREE_CHUNK rows of items_view; the rest follow as the
+        playlist is scrolled towards the end (see _on_tree_yscroll)."""
+        start = self._tree_filled
+        end = min(len(self.items_view), start + self.TREE_CHUNK)
+        for n in range(start, end):
+            idx = self.items_view[n]
             it = self.items_all[idx]
             self.tv.insert("", "end", iid=str(idx), values=(
-                n, it["name"], it["folder"],
+                n + 1, it["name"], it["folder"],
                 self._format_dur(it["duration_ms"]),
                 self._format_bytes(it["size"]),
                 self._format_dt(it["mtime"]),
             ))
+        self._tree_filled = end
+
+    def _on_tree_yscroll(self, first, last):
+        self._tree_sb.set(first, last)
+        if float(last) > 0.9 and self._tree_filled < len(self.items_view):
+            self.root.after_idle(self._fill_tree_more)
 
     def clear_filter(self):
         self.search_var.set(""); self.folder_filter.set("(All)"); self.apply_filter()
@@ -2012,8 +4672,15 @@ class PrajnaPlayerApp:
 
     def _play_index(self, idx, resume_ms: int = 0):
         if not self._ensure_player(): return
+        it = self.items_all[idx]
+        out, out_pos = self._playing_item, self._player_track_pos()     # before set_media replaces it
+        if out_pos is not None and out is not None and self._track_key(out) != self._track_key(it):
+            self._remember_track_pos(out, out_pos)
+        self._playing_item = it
         self._end_fired = False
         self.current_index = idx
+        if resume_ms <= 0:
+            resume_ms = self._track_resume_ms(it)
         path = Path(self.items_all[idx]["path"])
         self._set_now_playing(path)
         if vlc:
@@ -2028,7 +4695,7 @@ class PrajnaPlayerApp:
         if resume_ms > 0:
             self.root.after(900, lambda m=resume_ms: self._seek_ms_safe(m))
         # Save state immediately on play
-        self._save_state_now()
+        self._save_state_now(position=resume_ms)
 
     def _seek_ms_safe(self, ms: int):
         if not self.player or not vlc: return
@@ -2046,7 +4713,10 @@ class PrajnaPlayerApp:
         try:
             length = self.player.get_length()
             if length > 0:
-                self.items_all[idx]["duration_ms"] = length
+                it = self.items_all[idx]
+                if it.get("duration_ms") != length:
+                    it["duration_ms"] = length
+                    self._journal_static(self.current_folder, [_journal_dur(it)])
                 self._refresh_tree()
         except Exception:
             pass
@@ -2322,22 +4992,43 @@ class PrajnaPlayerApp:
         d = groups.get(best_base, {})
         return d.get("en"), d.get("vi")
 
+    def _parse_subs_cached(self, path: Path) -> CueTrack:
+        """parse_vtt_or_srt through the on-disk cue cache; misses are stored by
+        the background writer."""
+        cache = self.cue_cache
+        if cache is None:
+            return parse_vtt_or_srt(path)
+        try:
+            st = path.stat()
+            blob = cache.get(str(path), st.st_size, st.st_mtime_ns)
+            if blob is not None:
+                return _decode_cues(blob)
+        except (OSError, ValueError, sqlite3.Error):
+            st = None
+        cues = parse_vtt_or_srt(path)
+        if st is not None:
+            key = (str(path), st.st_size, st.st_mtime_ns)
+            self._writer.submit(("cues", key[0]), lambda: cache.put(*key, _encode_cues(cues)), delay=0.0)
+        return cues
+
     def _load_dual_subtitles(self, en_path: Optional[Path], vi_path: Optional[Path]):
-        en_cues, vi_cues = [], []
+        en_cues, vi_cues = CueTrack(), CueTrack()
         en_name, vi_name = "(none)", "(none)"
         if en_path:
             try:
-                en_cues = parse_vtt_or_srt(en_path); en_name = en_path.name
+                en_cues = self._parse_subs_cached(en_path); en_name = en_path.name
             except Exception as e:
                 messagebox.showerror("Subtitle error", f"Cannot parse EN subtitle:\n{e}")
         if vi_path:
             try:
-                vi_cues = parse_vtt_or_srt(vi_path); vi_name = vi_path.name
+                vi_cues = self._parse_subs_cached(vi_path); vi_name = vi_path.name
             except Exception as e:
                 messagebox.showerror("Subtitle error", f"Cannot parse VI subtitle:\n{e}")
 
         self.sub_en_file, self.sub_vi_file = en_path, vi_path
         self.sub_en_cues, self.sub_vi_cues = en_cues, vi_cues
+        for cues in (en_cues, vi_cues):
+            cues.eff_ends(self._hold_params)
         self._last_en_text = ""; self._last_vi_text = ""
 
         if en_cues or vi_cues:
@@ -2362,39 +5053,24 @@ class PrajnaPlayerApp:
         except Exception: return -1
 
     # >>> SMART-HOLD lookup <<<
-    def _lookup_cue_text(self, cues, t_ms_adj: int):
+    def _on_hold_params_changed(self, *_):
+        try:
+            params = (int(self.sub_linger_ms.get()), int(self.sub_min_hold_ms.get()), int(self.sub_per_char_ms.get()))
+        except (tk.TclError, ValueError):
+            return      # spinbox mid-edit
+        self._hold_params = params
+        for cues in (self.sub_en_cues, self.sub_vi_cues):
+            if cues:
+                cues.eff_ends(params)
+
+    def _lookup_cue_text(self, cues: CueTrack, t_ms_adj: int):
+        """Text showing at t_ms_adj: the last cue starting at or before it, while
+        inside its precomputed smart-hold end (gaps show nothing)."""
         if not cues:
             return None
-
-        LINGER   = int(self.sub_linger_ms.get())
-        MIN_HOLD = int(self.sub_min_hold_ms.get())
-        PER_CHAR = int(self.sub_per_char_ms.get())
-
-        def eff_end(i, a, b, s, next_start):
-            n_chars = len(re.sub(r"\s+", "", s or ""))
-            hold_ms = max(MIN_HOLD, PER_CHAR * n_chars)
-            end = max(b, a + hold_ms, b + LINGER)
-            return min(end, next_start - 40)
-
-        for i, (a, b, s) in enumerate(cues):
-            next_a = cues[i+1][0] if i+1 < len(cues) else 10**12
-            end_i = eff_end(i, a, b, s, next_a)
-
-            if a <= t_ms_adj < end_i:
-                return s
-
-            if t_ms_adj < a:
-                if i > 0:
-                    pa, pb, ps = cues[i-1]
-                    prev_end = eff_end(i-1, pa, pb, ps, a)
-                    if t_ms_adj < prev_end:
-                        return ps
-                break
-
-        la, lb, ls = cues[-1]
-        last_end = eff_end(len(cues)-1, la, lb, ls, 10**12)
-        if t_ms_adj < last_end:
-            return ls
+        k = cues.index_at(t_ms_adj)
+        if k >= 0 and t_ms_adj < cues.eff_ends(self._hold_params)[k]:
+            return cues.texts[k]
         return None
 
     def _update_subtitle_by_time(self, t_ms: int):
@@ -2471,6 +5147,8 @@ class PrajnaPlayerApp:
 
     # --- Resize/wrap ---
     def _on_root_configure(self, event):
+        if event.widget is self.root:
+            self._mark_config_dirty()       # geometry
         try:
             w = max(600, self.root.winfo_width() - 80)
             self.subtitle_en_lbl.configure(wraplength=w)
@@ -2486,16 +5164,16 @@ class PrajnaPlayerApp:
         folder = self._load_recent()
         if not folder or not Path(folder).exists():
             return
-        self.current_folder = folder
+        self._set_current_folder(folder)
         self._update_title()
-        self.scan_folder(folder)
+        self.scan_folder(folder, on_done=lambda: self._after_restore_scan(folder))
+
+    def _after_restore_scan(self, folder: str):
         self.sort_mode.set(SORT_CHOICES[0])
         self.resort(); self.apply_filter()
         st = self._load_state_for_folder(folder)
         self.volume.set(int(st.get("volume", 70)))
-        idx = None
-        if st.get("song") and Path(st["song"]).exists():
-            idx = self._index_of_path(st["song"])
+        idx = self._resume_index_for(st)
         if idx is None and isinstance(st.get("index"), int) and 0 <= st["index"] < len(self.items_all):
             idx = st["index"]
         if idx is not None:
@@ -2503,8 +5181,19 @@ class PrajnaPlayerApp:
 
     # --- Close ---
     def _on_close(self):
-        self._save_state_now()
+        self._stop_watcher()
+        self._save_state_now()      # before _cancel_scan: skipped while a scan still owns items_all
+        self._cancel_scan()
+        self._cancel_probe()
         self._save_config()
+        self._state_writer.close(timeout=5.0)   # final state flush
+        self._writer.close(timeout=10.0)        # flush queued static writes
+        if self.meta_store is not None:
+            self.meta_store.close()
+        if self.state_db is not None:
+            self.state_db.close()
+        if self.cue_cache is not None:
+            self.cue_cache.close()
         try:
             if self.player: self.player.stop()
         except Exception:
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks for PrajnaPlayer v21 (synthetic data, no GUI).
+
+    python prajna_bench.py probe [--files 400]
+    python prajna_bench.py static [--tracks 100000]
+    python prajna_bench.py subs [--cues 20000]
+
+probe  : header-only duration probe vs mutagen (what _make_item_from_path ran before)
+static : static.json (indent=2) vs static.bin — size, write, eager and lazy load time
+subs   : iter_sub_cues vs the previous parse_vtt_or_srt on synthetic SRT / YouTube VTT, cue memory
+"""
+
+import sys
+import time
+import struct
+import tempfile
+import argparse
+import json
+import re
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import PrajnaPlayer_v21 as pp  # noqa: E402
+
+
+# ----- Synthetic audio corpus -----
+def _make_wav(p: Path, seconds: float):
+    sr, ch, bits = 8000, 1, 16
+    byte_rate = sr * ch * bits // 8
+    data = b"\x00" * int(byte_rate * seconds)
+    fmt = struct.pack("<HHIIHH", 1, ch, sr, byte_rate, ch * bits // 8, bits)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data
+    p.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+
+def _make_flac(p: Path, seconds: float):
+    sr, total = 44100, int(44100 * seconds)
+    si = bytearray(34)
+    si[0:2] = (4096).to_bytes(2, "big"); si[2:4] = (4096).to_bytes(2, "big")
+    si[10] = (sr >> 12) & 0xFF
+    si[11] = (sr >> 4) & 0xFF
+    si[12] = ((sr & 0x0F) << 4) | (1 << 1)          # 2 channels, bps high bit 0
+    si[13] = (15 << 4) | ((total >> 32) & 0x0F)     # 16 bps
+    si[14:18] = (total & 0xFFFFFFFF).to_bytes(4, "big")
+    hdr = bytes([0x80]) + (34).to_bytes(3, "big")   # last metadata block, STREAMINFO
+    p.write_bytes(b"fLaC" + hdr + bytes(si) + b"\xFF\xF8" + b"\x00" * 4096)
+
+def _mp3_frame(kbps=128, sr=44100) -> bytes:
+    br_idx = pp._MP3_BITRATES[1].index(kbps)
+    sr_idx = pp._MP3_SAMPLE_RATES[3].index(sr)
+    hdr = bytes([0xFF, 0xFB, (br_idx << 4) | (sr_idx << 2), 0x44])
+    return hdr + b"\x00" * (144 * kbps * 1000 // sr - 4)
+
+def _make_mp3(p: Path, seconds: float, xing: bool):
+    frame = _mp3_frame()
+    n = int(seconds * 44100 / 1152)
+    id3 = b"ID3\x03\x00\x00" + bytes([0, 0, 0, 20]) + b"\x00" * 20
+    first = bytearray(frame)
+    if xing:
+        x = 4 + 32
+        first[x:x + 12] = b"Xing" + (1).to_bytes(4, "big") + n.to_bytes(4, "big")
+    p.write_bytes(id3 + bytes(first) + frame * (n - 1))
+
+def _make_m4a(p: Path, seconds: float):
+    def box(t, payload):
+        return struct.pack(">I", 8 + len(payload)) + t + payload
+    ts = 1000
+    mvhd = box(b"mvhd", b"\x00\x00\x00\x00" + struct.pack(">IIII", 0, 0, ts, int(seconds * ts)) + b"\x00" * 80)
+    p.write_bytes(box(b"ftyp", b"M4A \x00\x00\x00\x00isomM4A ") + box(b"mdat", b"\x00" * 2048) + box(b"moov", mvhd))
+
+def build_corpus(root: Path, n: int):
+    makers = (
+        (".wav", lambda p, s: _make_wav(p, s)),
+        (".flac", lambda p, s: _make_flac(p, s)),
+        (".mp3", lambda p, s: _make_mp3(p, s, xing=True)),
+        (".mp3", lambda p, s: _make_mp3(p, s, xing=False)),
+        (".m4a", lambda p, s: _make_m4a(p, s)),
+    )
+    files = []
+    for i in range(n):
+        ext, make = makers[i % len(makers)]
+        p = root / f"{i:05d}{ext}"
+        make(p, 2.0 + (i % 7))
+        files.append(str(p))
+    return files
+
+
+def _time(fn, files):
+    t0 = time.perf_counter()
+    out = [fn(f) for f in files]
+    return time.perf_counter() - t0, out
+
+
+def bench_probe(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        files = build_corpus(Path(tmp), args.files)
+        t_fast, fast = _time(pp._fast_probe_duration_ms, files)
+        print(f"fast header probe : {t_fast*1000:8.1f} ms  ({len(files)/t_fast:,.0f} files/s)")
+        if pp.MutagenFile is None:
+            print("mutagen           : not installed (pip install mutagen) — baseline skipped")
+            return
+        t_mut, slow = _time(pp._mutagen_duration_ms, files)
+        print(f"mutagen           : {t_mut*1000:8.1f} ms  ({len(files)/t_mut:,.0f} files/s)")
+        print(f"speed-up          : {t_mut / t_fast:.1f}x")
+        agree = sum(1 for a, b in zip(fast, slow) if a is not None and b is not None and abs(a - b) <= 50)
+        both = sum(1 for a, b in zip(fast, slow) if a is not None and b is not None)
+        print(f"agreement (±50ms) : {agree}/{both}  · fast inconclusive: {sum(a is None for a in fast)}")
+
+
+def _static_payload(n: int) -> dict:
+    dirs = max(1, n // 40)
+    tracks = []
+    for i in range(n):
+        d = f"/music/Artist {i % dirs:04d}/Album – Pháp âm {i % 7}"
+        name = f"{i:06d} Bài giảng số {i}.mp3"
+        tracks.append({"path": f"{d}/{name}", "title": name[:-4], "folder": d.rsplit("/", 1)[-1],
+                       "size": 3_000_000 + i, "mtime": 1.7e9 + i * 0.5,
+                       "duration_ms": (180_000 + i) if i % 10 else None, "id": f"{i + 4096:x}:{3_000_000 + i:x}"})
+    return {"title": "bench", "base_folder": "/music", "created_at": "", "scanned_at": 1.7e9,
+            "folder_id": "0123456789ab", "dirs": {f"d{k}": {"mtime": 1.7e9, "n": 40, "subs": []} for k in range(dirs)},
+            "tracks": tracks}
+
+
+def bench_static(args):
+    payload = _static_payload(args.tracks)
+    with tempfile.TemporaryDirectory() as tmp:
+        jp, bp = Path(tmp) / "static.json", Path(tmp) / "static.bin"
+        t0 = time.perf_counter(); pp._atomic_write_json(jp, payload); t_jw = time.perf_counter() - t0
+        t0 = time.perf_counter(); pp._atomic_write_bytes(bp, pp._encode_static_bin(payload)); t_bw = time.perf_counter() - t0
+        t0 = time.perf_counter(); dj = json.loads(jp.read_text(encoding="utf-8")); t_jr = time.perf_counter() - t0
+        t0 = time.perf_counter(); db = pp._decode_static_bin(bp.read_bytes()); t_br = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        lazy = pp._LazyItems(pp._TrackTable(bp))
+        first = [lazy[i]["name"] for i in range(min(50, len(lazy)))]
+        t_lz = time.perf_counter() - t0
+        lazy_ok = all(lazy[i] == pp.PrajnaPlayerApp._items_from_static(None, {"tracks": [db["tracks"][i]]}, False)[0]
+                      for i in range(0, len(lazy), max(1, len(lazy) // 1000)))
+        sj, sb = jp.stat().st_size, bp.stat().st_size
+    print(f"tracks            : {args.tracks:,}")
+    print(f"static.json       : {sj/1e6:7.2f} MB  write {t_jw*1000:7.1f} ms  load {t_jr*1000:7.1f} ms")
+    print(f"static.bin        : {sb/1e6:7.2f} MB  write {t_bw*1000:7.1f} ms  load {t_br*1000:7.1f} ms")
+    print(f"size / load ratio : {sj/sb:.1f}x smaller · {t_jr/t_br:.1f}x faster load")
+    print(f"static.bin lazy   : open + first {len(first)} rows {t_lz*1000:7.1f} ms (rows match eager: {lazy_ok})")
+    print(f"round-trip equal  : {dj['tracks'] == db['tracks']}")
+
+
+# ----- Subtitle parsing -----
+def _legacy_parse_vtt_or_srt(raw: str):
+    """parse_vtt_or_srt before iter_sub_cues (decoding left out: text in, cues out)."""
+    def cleanup(txt):
+        txt = re.sub(r"<[^>]+>", "", txt)
+        txt = re.sub(r"[ \t]+", " ", txt)
+        return txt.strip()
+
+    lines = raw.splitlines()
+    first_nonempty = ""
+    for ln in lines[:15]:
+        if ln.strip():
+            first_nonempty = ln.strip().lower()
+            break
+    is_vtt = first_nonempty.startswith("webvtt")
+    ts_hint = 0
+    for ln in lines[:80]:
+        if "-->" in ln and re.search(r"\d{1,2}:\d{2}:\d{2}[,\.]\d{1,3}", ln):
+            ts_hint += 1
+    is_srt = (not is_vtt) and ts_hint > 0
+    cues = []
+
+    def to_ms(x):
+        x = x.strip().replace(",", ".")
+        parts = x.split(":")
+        if len(parts) == 2:
+            h = 0; m = int(parts[0]); s = float(parts[1])
+        else:
+            h = int(parts[0]); m = int(parts[1]); s = float(parts[2])
+        return int(round((h * 3600 + m * 60 + s) * 1000))
+
+    buf = []
+    t_start = t_end = None
+    for i, ln in enumerate(lines):
+        if "-->" in ln:
+            if t_start is not None and buf:
+                txt = "\n".join(buf).strip()
+                if txt:
+                    cues.append((t_start, t_end, cleanup(txt)))
+            buf = []
+            try:
+                left, right = ln.split("-->")
+                t_start = to_ms(left.strip())
+                right = right.strip().split(" ", 1)[0]
+                t_end = to_ms(right.strip())
+            except Exception:
+                t_start = t_end = None
+        else:
+            if is_srt and ln.strip().isdigit() and (i + 1 < len(lines) and "-->" in lines[i + 1]):
+                continue
+            if ln.strip() == "" and buf:
+                if t_start is not None:
+                    txt = "\n".join(buf).strip()
+                    if txt:
+                        cues.append((t_start, t_end, cleanup(txt)))
+                buf = []
+                t_start = t_end = None
+            else:
+                if t_start is not None:
+                    buf.append(ln)
+    if t_start is not None and buf:
+        txt = "\n".join(buf).strip()
+        if txt:
+            cues.append((t_start, t_end, cleanup(txt)))
+    cues.sort(key=lambda x: x[0])
+    return cues
+
+
+def _ts(ms: int, sep: str) -> str:
+    h, ms = divmod(ms, 3_600_000); m, ms = divmod(ms, 60_000); s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+
+def _make_srt(n: int) -> str:
+    out = []
+    for i in range(n):
+        a, b = i * 2500, i * 2500 + 2300
+        text = f"Câu số {i}: chánh niệm trong từng hơi thở" if i % 2 else f"<i>Sentence {i}</i>  about  mindful breathing"
+        if i % 5 == 0:
+            text += "\nand a second line"
+        if i % 997 == 0:
+            b_txt = _ts(b, ",")[:-3] + "1234"          # 4 fraction digits: slow path
+        else:
+            b_txt = _ts(b, ",")
+        out.append(f"{i + 1}\n{_ts(a, ',')} --> {b_txt}\n{text}\n")
+    return "\n".join(out)
+
+def _make_youtube_vtt(n: int) -> str:
+    out = ["WEBVTT\nKind: captions\nLanguage: en\n"]
+    prev = ""
+    for i in range(n):
+        a = i * 1800
+        words = [f"word{i}_{k}" for k in range(6)]
+        timed = words[0] + "".join(f"<{_ts(a + 250 * k, '.')}><c> {w}</c>" for k, w in enumerate(words[1:], 1))
+        out.append(f"{_ts(a, '.')} --> {_ts(a + 1790, '.')} align:start position:0%\n{prev}\n{timed}\n")
+        out.append(f"{_ts(a + 1790, '.')} --> {_ts(a + 1800, '.')} align:start position:0%\n{' '.join(words)}\n \n")
+        prev = " ".join(words)
+    return "\n".join(out)
+
+
+def bench_subs(args):
+    for name, raw in (("SRT", _make_srt(args.cues)), ("VTT (YouTube)", _make_youtube_vtt(args.cues // 2))):
+        mb = len(raw.encode("utf-8")) / 1e6
+        t_old = t_new = float("inf")
+        for _ in range(args.repeat):            # best of N: the parse is short and noisy
+            t0 = time.perf_counter(); old = _legacy_parse_vtt_or_srt(raw); t_old = min(t_old, time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            new = list(pp.iter_sub_cues(raw)); new.sort(key=lambda x: x[0])
+            t_new = min(t_new, time.perf_counter() - t0)
+        print(f"{name:<14}: {len(new):,} cues · {mb:.2f} MB")
+        print(f"  previous    : {t_old*1000:8.1f} ms  {len(old)/t_old:>10,.0f} cues/s  {mb/t_old:6.1f} MB/s")
+        print(f"  iter_sub_cues: {t_new*1000:7.1f} ms  {len(new)/t_new:>10,.0f} cues/s  {mb/t_new:6.1f} MB/s")
+        print(f"  speed-up    : {t_old / t_new:.1f}x  · identical output: {old == new}")
+        tracemalloc.start()
+        keep = sorted(pp.iter_sub_cues(raw), key=lambda x: x[0]); m_list = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop(); del keep
+        tracemalloc.start()
+        keep = pp.CueTrack.from_cues(pp.iter_sub_cues(raw)); m_track = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        m_text = sum(sys.getsizeof(t) for t in keep.texts)
+        print(f"  memory/cue  : tuples {m_list/len(new):.0f} B · CueTrack {m_track/len(new):.0f} B"
+              f"  (of which text {m_text/len(new):.0f} B)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("probe", help="header-only duration probe vs mutagen")
+    p.add_argument("--files", type=int, default=400)
+    p.set_defaults(func=bench_probe)
+    p = sub.add_parser("static", help="static.json vs compact static.bin")
+    p.add_argument("--tracks", type=int, default=100_000)
+    p.set_defaults(func=bench_static)
+    p = sub.add_parser("subs", help="subtitle parse throughput (SRT / VTT)")
+    p.add_argument("--cues", type=int, default=20_000)
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_subs)
+    args = ap.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()